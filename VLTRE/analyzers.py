@@ -0,0 +1,144 @@
+# analyzers.py
+
+import re
+import hashlib
+
+from VLTRE import counting
+
+# Markers counted by --markers
+MARKERS = ("TODO", "FIXME", "XXX", "HACK")
+HASH_ALGORITHMS = ("md5", "sha1", "sha256", "blake2b")
+
+
+class Analyzer:
+    """
+    A per-file metric computed from the file's bytes.
+    Every enabled analyzer is fed the same buffer, so a file is read once
+    no matter how many analyzers run.
+    """
+    name = ""
+
+    def analyze(self, data):
+        """Return this analyzer's value for one file's contents."""
+        raise NotImplementedError
+
+    def empty_total(self):
+        """Return the starting value of this analyzer's scan-wide total."""
+        return {}
+
+    def add(self, total, value):
+        """Fold one file's value into the scan-wide total and return it."""
+        return total
+
+    @staticmethod
+    def merge(total, other):
+        """Combine two scan-wide totals (used when merging partial results)."""
+        return total
+
+
+class LineCounter(Analyzer):
+    name = "lines"
+
+    def analyze(self, data):
+        return counting.count_nonblank(data)
+
+
+class GrepAnalyzer(Analyzer):
+    name = "grep"
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.regex = re.compile(pattern.encode("utf-8"), re.MULTILINE)
+
+    def analyze(self, data):
+        return sum(1 for _ in self.regex.finditer(data))
+
+    def empty_total(self):
+        return {"pattern": self.pattern, "matches": 0, "files": 0}
+
+    def add(self, total, value):
+        if value:
+            total["matches"] += value
+            total["files"] += 1
+        return total
+
+    @staticmethod
+    def merge(total, other):
+        total["matches"] += other.get("matches", 0)
+        total["files"] += other.get("files", 0)
+        return total
+
+
+class MarkerCounter(Analyzer):
+    name = "markers"
+
+    def __init__(self, markers=MARKERS):
+        self.markers = markers
+        self.regex = re.compile(rb"\b(" + b"|".join(m.encode() for m in markers) + rb")\b")
+
+    def analyze(self, data):
+        counts = {}
+        for match in self.regex.findall(data):
+            marker = match.decode()
+            counts[marker] = counts.get(marker, 0) + 1
+        return counts
+
+    def empty_total(self):
+        return {marker: 0 for marker in self.markers}
+
+    def add(self, total, value):
+        return self.merge(total, value)
+
+    @staticmethod
+    def merge(total, other):
+        for marker, count in other.items():
+            total[marker] = total.get(marker, 0) + count
+        return total
+
+
+class Hasher(Analyzer):
+    name = "hash"
+
+    def __init__(self, algorithm="sha256"):
+        self.algorithm = algorithm
+
+    def analyze(self, data):
+        return hashlib.new(self.algorithm, data).hexdigest()
+
+    def empty_total(self):
+        return {"algorithm": self.algorithm, "files": 0}
+
+    def add(self, total, value):
+        total["files"] += 1
+        return total
+
+    @staticmethod
+    def merge(total, other):
+        total["files"] += other.get("files", 0)
+        return total
+
+
+def build_analyzers(args):
+    """Return the analyzers enabled by the command-line arguments, LOC first."""
+    pipeline = [LineCounter()]
+    if getattr(args, 'grep', None):
+        pipeline.append(GrepAnalyzer(args.grep))
+    if getattr(args, 'markers', False):
+        pipeline.append(MarkerCounter())
+    if getattr(args, 'hash', None):
+        pipeline.append(Hasher(args.hash))
+    return pipeline
+
+
+ANALYZER_TYPES = {cls.name: cls for cls in (LineCounter, GrepAnalyzer, MarkerCounter, Hasher)}
+
+
+def merge_totals(totals, other):
+    """Merge the 'analysis' totals of two partial results."""
+    merged = dict(totals)
+    for name, value in other.items():
+        if name not in merged:
+            merged[name] = dict(value)
+        else:
+            merged[name] = ANALYZER_TYPES[name].merge(dict(merged[name]), value)
+    return merged
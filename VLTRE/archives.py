@@ -0,0 +1,41 @@
+# archives.py
+
+import tarfile
+import zipfile
+from functools import partial
+
+ZIP_SUFFIXES = (".zip", ".whl", ".jar", ".egg")
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# Separator between an archive's path and a member path, e.g. dist/pkg.whl!/pkg/mod.py
+MEMBER_SEP = "!/"
+
+
+def is_archive(name):
+    """Return True if a file name has a supported archive suffix."""
+    lower = name.lower()
+    return lower.endswith(ZIP_SUFFIXES) or lower.endswith(TAR_SUFFIXES)
+
+
+def iter_members(source, name):
+    """
+    Yield (member_path, size, opener) for every regular file in an archive.
+    source is a filesystem path or a binary file object; opener() returns a
+    binary stream of the member's bytes and must be used before the next
+    member is requested (tar archives are read as a forward-only stream).
+    """
+    if name.lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(source) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                yield info.filename, info.file_size, partial(zf.open, info)
+        return
+    if isinstance(source, str):
+        tf = tarfile.open(name=source, mode="r|*")
+    else:
+        tf = tarfile.open(fileobj=source, mode="r|*")
+    with tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            yield member.name, member.size, partial(tf.extractfile, member)
@@ -0,0 +1,113 @@
+# checkpoint.py
+
+import os
+import json
+import tempfile
+
+# Version of the checkpoint format written by --checkpoint
+CHECKPOINT_VERSION = 1
+# Default seconds between checkpoints
+DEFAULT_INTERVAL = 60.0
+
+# Keys temporarily attached to tree nodes so that queue and sample references
+# survive serialisation of the tree
+_QUEUED = "_queued"
+_UNSAMPLED = "_unsampled"
+
+
+def checkpoint_path(path, index, count):
+    """Return the checkpoint file for root number `index` of `count` roots."""
+    return path if count == 1 else f"{path}.{index}"
+
+
+def write_atomic(path, text):
+    """Write text to a temporary file next to path and rename it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".pot-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def save(path, root, options, result, root_node, queue, largest, strata, unsampled, rng):
+    """
+    Persist the state of an in-progress breadth-first walk. Queued directories
+    and unsampled files are recorded on their tree nodes, so the tree is
+    written once and every reference can be restored from it.
+    """
+    for seq, (folder, node, depth, start) in enumerate(queue):
+        node[_QUEUED] = [seq, folder, depth, start]
+    for node, key, ext, file_path in unsampled:
+        node[_UNSAMPLED] = [key, ext, file_path]
+    try:
+        text = json.dumps({
+            "version": CHECKPOINT_VERSION,
+            "root": root,
+            "options": options,
+            "complete": not queue,
+            "result": result,
+            "tree": root_node,
+            "largest": largest,
+            "strata": strata,
+            "rng": rng.getstate(),
+        })
+    finally:
+        for _, node, _, _ in queue:
+            del node[_QUEUED]
+        for node, _, _, _ in unsampled:
+            del node[_UNSAMPLED]
+    write_atomic(path, text)
+
+
+def load(path, root, options):
+    """
+    Read a checkpoint written by save() for the same root and scan options.
+    Returns None when there is none or when it records a finished walk, so
+    that the scan starts over; raises ValueError when it cannot be used.
+    The returned dict holds the result, root node, queue, largest heap, strata,
+    unsampled list and rng state, ready for scan_root() to continue from.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version {data.get('version')}")
+    if data.get("root") != root or data.get("options") != options:
+        raise ValueError("checkpoint was written for a different root or different scan options")
+    if data.get("complete"):
+        return None
+    queued = []
+    unsampled = []
+    stack = [data["tree"]]
+    while stack:
+        node = stack.pop()
+        if _QUEUED in node:
+            seq, folder, depth, start = node.pop(_QUEUED)
+            queued.append((seq, (folder, node, depth, start)))
+        for child in node.get("children", ()):
+            if child["type"] == "dir":
+                stack.append(child)
+            elif _UNSAMPLED in child:
+                key, ext, file_path = child.pop(_UNSAMPLED)
+                unsampled.append((child, key, ext, file_path))
+    queued.sort(key=lambda item: item[0])
+    version, internal, gauss = data["rng"]
+    return {
+        "result": data["result"],
+        "tree": data["tree"],
+        "queue": [item for _, item in queued],
+        "largest": [tuple(item) for item in data["largest"]],
+        "strata": data["strata"],
+        "unsampled": unsampled,
+        "rng": (version, tuple(internal), gauss),
+    }
@@ -7,45 +7,47 @@ and a progress indicator. Banner aligned right, tree/status below.
 import sys
 import platform
 import os
+import re
 import json
+import shutil
 import threading
 import tempfile
 import webbrowser
 import socketserver
 import http.server
 from pathlib import Path
-import re
-import matplotlib.pyplot as plt
 from VLTRE import display
 
 from VLTRE import clipboard
+from VLTRE import daemon
+from VLTRE import filters
 from VLTRE import utils  # Import get_banner_lines from utils
 from VLTRE import tree_progress
-from VLTRE.config import parse_args
-
-# Support for color output
-try:
-    from colorama import init as _cinit, Fore, Style
-    _cinit()
-    COLOR = {
-        "dir": Fore.CYAN + Style.BRIGHT,
-        "file": Fore.GREEN,
-        "big": Fore.RED + Style.BRIGHT,
-        "skipped": Fore.WHITE + Style.DIM,
-        "reset": Style.RESET_ALL,
-    }
-except ImportError:
-    from collections import defaultdict
-    COLOR = defaultdict(str)
-    COLOR["reset"] = ""
-
-# Global flag
+from VLTRE import render
+from VLTRE import reports
+from VLTRE import sampling
+from VLTRE import scanner
+from VLTRE import state_store
+from VLTRE import throttle
+from VLTRE.config import parse_args, parse_merge_args, parse_daemon_args
+
+# Global flags
 IS_CLI_MODE = True
+BATCH_MODE = False
+
+# Exit codes
+EXIT_OK = 0
+EXIT_ERROR = 1       # invalid root, unreadable partial result
+EXIT_USAGE = 2       # bad command line (argparse)
+EXIT_INCOMPLETE = 3  # report produced, but some paths could not be scanned
+
+# Where --visualize writes the graph when no display is available
+DEFAULT_GRAPH_PATH = "pot_graph.png"
 
 def display_banner():
     banner_lines = display.get_banner_lines()
     def print_left_aligned(lines):
-        term_width = os.get_terminal_size().columns
+        term_width = shutil.get_terminal_size().columns
         max_line_length = max(len(line) for line in lines)
         padding = max(0, term_width - max_line_length)
         for line in lines:
@@ -66,20 +68,14 @@ def display_banner_with_tree():
     # Show current stage explicitly
     print(f"\nCurrent Stage: {current_stage}\n")
 
-    # Update progress
-    user_data['total_runs'] = user_data.get('total_runs', 0) + 1
-    if user_data['total_runs'] % 10 == 0:
-        if user_data['growth_stage'] < 4:
-            user_data['growth_stage'] += 1
-        else:
-            # Keep at max stage 4 or wrap to 0 if desired
-            user_data['growth_stage'] = 0
-        user_data['regrow_count'] = user_data.get('regrow_count', 0) + 1
-    # Save user data
-    tree_progress.save_user_data(user_data)
+    # Update progress: one run recorded as an increment and written once at exit,
+    # so the banner never waits on disk and parallel runs never lose each other's
+    # counts. The stage advances every RUNS_PER_STAGE runs, derived on read.
+    state_store.add({"total_runs": 1}, defer=True)
+    user_data.update(state_store.derive(user_data['total_runs'] + 1))
 
     # Show progress bar
-    progress = (user_data['total_runs'] % 10) / 10
+    progress = (user_data['total_runs'] % state_store.RUNS_PER_STAGE) / state_store.RUNS_PER_STAGE
     tree_progress.show_progress_bar(progress, indent=indent)
 
     # Show regrow count
@@ -158,14 +154,29 @@ def build_html_from_text(text):
     """
 
 def main():
+    # `pot merge PARTIAL...` combines partial results from earlier scans
+    if sys.argv[1:2] == ["merge"]:
+        merge_main(sys.argv[2:])
+        return
+    # `pot daemon` keeps results warm for repeat queries
+    if sys.argv[1:2] == ["daemon"]:
+        daemon_main(sys.argv[2:])
+        return
+
     args = parse_args()
 
-    # Show the pot tree and status below banner
-    display_banner_with_tree()
+    # Batch mode: no banner, no progress-file I/O, no colours, no chatter
+    global IS_CLI_MODE, BATCH_MODE
+    BATCH_MODE = getattr(args, 'batch', False) or not sys.stdout.isatty()
+    if BATCH_MODE:
+        IS_CLI_MODE = False
+    else:
+        # Show the pot tree and status below banner
+        display_banner_with_tree()
 
     # Exit if no arguments
     if len(sys.argv) <= 1:
-        sys.exit(0)
+        sys.exit(EXIT_OK)
 
     verbose = getattr(args, 'verbose', False)
 
@@ -176,10 +187,9 @@ def main():
     if getattr(args, 'list_drives', False):
         for d in list_drives():
             print(d)
-        sys.exit(0)
+        sys.exit(EXIT_OK)
 
     # Set CLI mode
-    global IS_CLI_MODE
     if getattr(args, 'no_color', False):
         IS_CLI_MODE = False
 
@@ -214,117 +224,318 @@ def main():
             roots = [Path('/')]
     else:
         try:
-            roots = [Path(args.root)]
+            roots = [Path(r) for r in args.root]
         except Exception as e:
-            print(f"[ERROR] Invalid root path: {args.root}")
-            sys.exit(1)
+            print(f"[ERROR] Invalid root path: {args.root}", file=sys.stderr)
+            sys.exit(EXIT_ERROR)
+        missing = [r for r in roots if not r.exists()]
+        for r in missing:
+            print(f"[ERROR] Path does not exist: {r}", file=sys.stderr)
+        if missing:
+            sys.exit(EXIT_ERROR)
 
     verbose = getattr(args, 'verbose', False)
     if verbose:
         print(f"[DEBUG] Roots to scan: {roots}")
 
-    # Initialize stats
-    TOTAL_LINES = 0
-    TOTAL_FILES = 0
-    TOTAL_DIRS = 0
-    COUNTED_FILES = 0
-    LINE_BY_EXT = {}
-    LARGEST = []
-    TREE_LINES = []
-
-    def ignored(p):
+    if getattr(args, 'resume', False) and not getattr(args, 'checkpoint', ''):
+        print("[ERROR] --resume requires --checkpoint FILE", file=sys.stderr)
+        sys.exit(EXIT_USAGE)
+    if getattr(args, 'where', None):
         try:
-            if p.name.startswith('.'):
-                return True
-            if getattr(args, 'share_entire_pot', False):
-                return False
-            ignore_patterns = {
-                "__pycache__", ".git", "node_modules", "dist", "build",
-                "venv", "env", "env.bak", "site-packages"
-            }
-            return any(pat in p.name for pat in ignore_patterns)
-        except:
-            return True
-
-    def loc(p):
+            filters.parse(args.where)
+        except ValueError as e:
+            print(f"[ERROR] Invalid --where expression: {e}", file=sys.stderr)
+            sys.exit(EXIT_USAGE)
+    if getattr(args, 'grep', None):
         try:
-            with p.open("r", encoding="utf-8", errors="ignore") as f:
-                return sum(1 for line in f if line.strip())
-        except:
-            return 0
-
-    def walk(folder, show_all, depth=0, max_depth=0):
-        nonlocal TOTAL_FILES, TOTAL_DIRS, COUNTED_FILES, TOTAL_LINES
+            # Compiled the way GrepAnalyzer compiles it, before any worker starts
+            re.compile(args.grep.encode("utf-8"), re.MULTILINE)
+        except re.error as e:
+            print(f"[ERROR] Invalid --grep pattern: {e}", file=sys.stderr)
+            sys.exit(EXIT_USAGE)
+
+    # --nice before any worker starts, so that they inherit the priorities
+    if getattr(args, 'nice', False):
+        applied = throttle.lower_priority()
+        if verbose:
+            print(f"[DEBUG] Lowered priority: {', '.join(applied) or 'not supported here'}")
+
+    # Ask a running daemon first; otherwise scan every root (one worker
+    # process per root) and merge the partial results
+    result = None
+    if not getattr(args, 'no_daemon', False):
+        result = daemon.try_scan(roots, args)
+        if result is not None and verbose:
+            print(f"[DEBUG] Results served by daemon at {daemon.SOCKET_PATH}")
+    if result is None:
+        result = scanner.scan_roots(roots, args, jobs=getattr(args, 'jobs', 0))
+        result["io_limit"] = getattr(args, 'io_limit', 0)
+        result["files_limit"] = getattr(args, 'files_per_sec', 0)
+        result["nice"] = getattr(args, 'nice', False)
+
+    if getattr(args, 'save_partial', ''):
         try:
-            if max_depth > 0 and depth >= max_depth:
-                return
-            if not os.path.exists(folder):
-                print(f"[ERROR] Path does not exist: {folder}")
-                return
-            if not os.access(folder, os.R_OK):
-                print(f"[ERROR] Cannot read directory: {folder}")
-                return
-            TOTAL_DIRS += 1
-            for p in sorted(Path(folder).iterdir(), key=lambda x: (x.is_file(), x.name.lower())):
-                if ignored(p):
-                    continue
-                indent = "│   " * (depth) + "├── "
-                if p.is_dir():
-                    display.colour("dir", p.name, IS_CLI_MODE)
-                    TREE_LINES.append(f"{indent}{display.colour('dir', p.name, IS_CLI_MODE)}/")
-                    walk(p, show_all, depth + 1, max_depth)
-                else:
-                    TOTAL_FILES += 1
-                    lines = 0
-                    if hasattr(args, 'ext') and p.suffix.lower() in args.ext:
-                        lines = loc(p)
-                        TOTAL_LINES += lines
-                        COUNTED_FILES += 1
-                        LINE_BY_EXT[p.suffix.lower()] = LINE_BY_EXT.get(p.suffix.lower(), 0) + lines
-                        LARGEST.append((lines, p))
-                    role = "big" if lines >= getattr(args, 'BIG_FILE', 300) else "file"
-                    display_name = display.colour(role, p.name, IS_CLI_MODE)
-                    line_str = f"{indent}{display_name:35} {lines:>7}" if lines else f"{indent}{display_name}"
-                    TREE_LINES.append(line_str)
+            scanner.save_partial(result, args.save_partial)
         except Exception as e:
-            print(f"[ERROR] Error during directory walk {folder}: {e}")
-
-    max_depth_value = getattr(args, 'max_depth', 0)
-    for root in roots:
-        walk(root, show_all=getattr(args, 'share_entire_pot', False), max_depth=max_depth_value)
-
-    # Build root display
-    root_path_str = str(roots[0].resolve())
-    root_disp = root_path_str if getattr(args, 'full_path', False) else Path(root_path_str).name
-
-    from colorama import Fore, Style
-    root_color = Fore.MAGENTA + Style.BRIGHT
-    default_color = COLOR["reset"]
-    title = f"{display.colour('dir', roots[0].name)}\n"
-    tree_str = "\n".join(TREE_LINES) if TREE_LINES else ""
+            print(f"[ERROR] Saving partial result failed: {e}", file=sys.stderr)
+
+    sys.exit(report(result, args))
+
+def daemon_main(argv):
+    """Run or stop the warm scanner daemon."""
+    args = parse_daemon_args(argv)
+    socket_path = args.socket or daemon.SOCKET_PATH
+    if not daemon.available():
+        print("[ERROR] pot daemon needs Unix domain socket support", file=sys.stderr)
+        sys.exit(EXIT_ERROR)
+    if args.stop:
+        if daemon.stop(socket_path):
+            print(f"[INFO] Stopped pot daemon on {socket_path}")
+            sys.exit(EXIT_OK)
+        print(f"[ERROR] No pot daemon is listening on {socket_path}", file=sys.stderr)
+        sys.exit(EXIT_ERROR)
+    sys.exit(daemon.serve(socket_path, args.refresh))
+
+def merge_main(argv):
+    """Merge partial results written with --save-partial into one report."""
+    args = parse_merge_args(argv)
+
+    global IS_CLI_MODE, BATCH_MODE
+    BATCH_MODE = getattr(args, 'batch', False) or not sys.stdout.isatty()
+    if getattr(args, 'no_color', False) or BATCH_MODE:
+        IS_CLI_MODE = False
 
-    root_node = f"{root_color}├── {root_disp}{default_color}\n"
+    parts = []
+    for path in args.partials:
+        try:
+            parts.append(scanner.load_partial(path))
+        except Exception as e:
+            print(f"[ERROR] Cannot load partial result {path}: {e}", file=sys.stderr)
+            sys.exit(EXIT_ERROR)
+        if parts[-1].get("options") is None:
+            print(f"[INFO] {path} records no scan options; cannot check that it matches the others",
+                  file=sys.stderr)
+    conflicts = scanner.option_conflicts(parts)
+    if conflicts:
+        print(f"[ERROR] Partial results were scanned with different options ({', '.join(conflicts)}); "
+              f"refusing to add them up", file=sys.stderr)
+        sys.exit(EXIT_ERROR)
+    result = scanner.merge_results(parts, getattr(args, 'top', 10))
+    scanner.label_hosts(result)
+
+    if getattr(args, 'save_partial', ''):
+        try:
+            scanner.save_partial(result, args.save_partial)
+        except Exception as e:
+            print(f"[ERROR] Saving partial result failed: {e}", file=sys.stderr)
+
+    sys.exit(report(result, args))
+
+def build_summary(result, cli_mode=True):
+    """Return the summary block printed below the tree."""
+    roots = [Path(r) for r in result["roots"]] or [Path('.')]
+    title = f"{display.colour('dir', roots[0].name, cli_mode)}\n"
+    lines = "" if result.get("size_only") else \
+        f"{display.colour('big', 'Total source lines', cli_mode)}: {result['total_lines']:,}  "
+    summary = f"{' ' * 4}{'─'*70}\n" + \
+              f"{title}\n" + \
+              f"{'─'*70}\n" + \
+              f"{display.colour('dir', 'Dirs', cli_mode)}: {result['dirs']}  " \
+              f"{display.colour('file', 'Files', cli_mode)}: {result['files']}  " \
+              f"{lines}" \
+              f"{display.colour('file', 'Size', cli_mode)}: {render.format_bytes(result['total_bytes'])}\n"
+    if result.get("size_only"):
+        top = result.get("top", 10)
+        summary += f"\n{display.colour('file', 'Bytes by extension', cli_mode)} (size only, no files opened):\n"
+        by_size = sorted(result["by_ext_bytes"].items(), key=lambda item: item[1], reverse=True)
+        for ext, size in by_size[:top]:
+            summary += f"  {ext or '(none)':<10} {render.format_bytes(size):>10}\n"
+        if len(by_size) > top:
+            summary += f"  ... and {len(by_size) - top:,} more\n"
+        summary += f"{display.colour('big', 'Largest files', cli_mode)}:\n"
+        for size, path in result["largest_bytes"]:
+            summary += f"{render.format_bytes(size):>10}  {path}\n"
+    if (result["skipped_binary"] or result["skipped_large"] or result["estimated_files"]
+            or result.get("unreadable_files")):
+        summary += f"{display.colour('skipped', 'Skipped binary', cli_mode)}: {result['skipped_binary']}  " \
+                   f"{display.colour('skipped', 'Skipped too large', cli_mode)}: {result['skipped_large']}  " \
+                   f"{display.colour('big', 'Unreadable', cli_mode)}: {result.get('unreadable_files', 0)}  " \
+                   f"{display.colour('skipped', 'Estimated', cli_mode)}: {result['estimated_files']}" \
+                   f"{' (totals include estimates)' if result['estimated_files'] else ''}\n"
+    if result.get("archives"):
+        summary += f"{display.colour('dir', 'Archives', cli_mode)}: {result['archives']:,} opened, " \
+                   f"{result['archive_members']:,} members scanned\n"
+    io_limit = result.get("io_limit", 0)
+    files_limit = result.get("files_limit", 0)
+    if (io_limit or files_limit or result.get("nice")) and result.get("elapsed"):
+        elapsed = result["elapsed"]
+        visited = result["files"] + result.get("filtered_files", 0)
+        summary += f"{display.colour('skipped', 'Throttle', cli_mode)}: read {render.format_bytes(result['bytes_read'])} " \
+                   f"in {elapsed:.1f}s = {render.format_bytes(result['bytes_read'] / elapsed)}/s" \
+                   f"{f' (limit {io_limit:g} MB/s)' if io_limit else ''}, " \
+                   f"{visited / elapsed:,.0f} files/s{f' (limit {files_limit:g})' if files_limit else ''}" \
+                   f"{', low priority' if result.get('nice') else ''}\n"
+    if result.get("where"):
+        summary += f"{display.colour('file', 'Filter', cli_mode)}: {result['where']}  " \
+                   f"({result['files']:,} files matched, {result['filtered_files']:,} filtered out, " \
+                   f"{result['pruned_dirs']:,} directories pruned without listing)\n"
+    if result.get("dependency_dirs"):
+        summary += f"{display.colour('skipped', 'Dependencies', cli_mode)}: {result['dependency_dirs']:,} dirs, " \
+                   f"{result['dependency_files']:,} files, {render.format_bytes(result['dependency_bytes'])} " \
+                   f"(stat only, not included in the totals above)\n"
+    estimate = result.get("estimate")
+    if estimate:
+        opened = estimate["sampled_files"]
+        summary += f"{display.colour('big', 'Sampled estimate', cli_mode)}: total ~{result['total_lines']:,} " \
+                   f"± {sampling.ci95(estimate['variance']):,.0f} lines (95% CI); opened {opened:,} of " \
+                   f"{opened + estimate['extrapolated_files']:,} counted files\n"
+        for ext, lines in sorted(result["by_ext"].items(), key=lambda item: item[1], reverse=True):
+            ci = sampling.ci95(estimate["by_ext_variance"].get(ext, 0.0))
+            summary += f"  {ext:<10} ~{lines:>12,} ± {ci:,.0f}\n"
+    if result.get("pending_dirs"):
+        summary += f"\n{display.colour('big', 'Time budget reached', cli_mode)}: " \
+                   f"{result['pending_dirs']:,} directories pending; results are partial. Truncated:\n"
+        shown = result["truncated"][:result.get("top", 10)]
+        for path in shown:
+            summary += f"  {path}\n"
+        if len(result["truncated"]) > len(shown):
+            summary += f"  ... and {len(result['truncated']) - len(shown):,} more\n"
+    analysis = result.get("analysis", {})
+    if "grep" in analysis:
+        grep = analysis["grep"]
+        summary += f"\n{display.colour('big', 'Grep', cli_mode)} /{grep['pattern']}/: " \
+                   f"{grep['matches']:,} matches in {grep['files']:,} files\n"
+        for matches, path in result.get("grep_top", []):
+            summary += f"{matches:>10,}  {path}\n"
+    if "markers" in analysis:
+        counts = "  ".join(f"{marker} {count:,}" for marker, count in analysis["markers"].items())
+        summary += f"{display.colour('big', 'Markers', cli_mode)}: {counts}\n"
+    if "hash" in analysis:
+        duplicates = result.get("duplicates", [])
+        summary += f"{display.colour('file', 'Hashed files', cli_mode)} ({analysis['hash']['algorithm']}): " \
+                   f"{analysis['hash']['files']:,}  duplicate groups: {len(duplicates)}\n"
+        for paths in duplicates:
+            summary += f"  {' = '.join(paths)}\n"
+    projects = result.get("projects", [])
+    if projects:
+        summary += f"\n{display.colour('dir', 'Projects', cli_mode)}: {sum(1 for p in projects if p['path']):,}\n"
+        for project in projects:
+            summary += f"{project['lines']:>10,}  {project['files']:>8,} files  " \
+                       f"{render.format_bytes(project['size']):>10}  " \
+                       f"{display.colour('dir', project['path'] or '(no project)', cli_mode)}\n"
+            by_ext = sorted(project["by_ext"].items(), key=lambda item: item[1], reverse=True)
+            if by_ext:
+                summary += " " * 12 + "  ".join(f"{ext or '(none)'} {lines:,}" for ext, lines in by_ext) + "\n"
+            for lines, path in project["largest"]:
+                summary += f"{' ' * 12}{lines:>8,}  {path}\n"
+    top_dirs = result.get("top_dirs", [])
+    if top_dirs:
+        summary += f"\n{display.colour('dir', 'Heaviest directories', cli_mode)} (by {result['top_dirs_metric']}):\n"
+        for entry in top_dirs:
+            lines = "" if result.get("size_only") else f"{entry['lines']:>10,}  "
+            summary += f"{lines}{entry['files']:>8,} files  " \
+                       f"{render.format_bytes(entry['size']):>10}  {entry['path']}\n"
+    return summary
+
+def estimate_json(result):
+    """Return the sampling summary with 95% confidence intervals for --json, or None."""
+    estimate = result.get("estimate")
+    if not estimate:
+        return None
+    return {
+        "fraction": estimate.get("fraction"),
+        "seed": estimate.get("seed"),
+        "sampled_files": estimate["sampled_files"],
+        "extrapolated_files": estimate["extrapolated_files"],
+        "total_lines_ci95": sampling.ci95(estimate["variance"]),
+        "by_ext_ci95": {ext: sampling.ci95(v) for ext, v in estimate["by_ext_variance"].items()},
+    }
 
-    report_str = f"{root_node}{tree_str}\n" + \
-                 f"{' ' * 4}{'─'*70}\n" + \
-                 f"{title}\n" + \
-                 f"{'─'*70}\n" + \
-                 f"{display.colour('dir', 'Dirs')}: {TOTAL_DIRS}  " \
-                 f"{display.colour('file', 'Files')}: {TOTAL_FILES}  " \
-                 f"{display.colour('big', 'Total source lines')}: {TOTAL_LINES:,}\n"
+def build_plain_report(result, args):
+    """Return the colour-free report text used for --copy, --txt and --open-url."""
+    tree_str = render.render_tree(result["tree"], False, getattr(args, 'BIG_FILE', 300),
+                                  getattr(args, 'full_path', False), result.get("size_only", False))
+    return f"{tree_str}\n{build_summary(result, False)}"
+
+def report(result, args):
+    """Print and export the report for a (merged) scan result; return the exit code."""
+    roots = [Path(r) for r in result["roots"]] or [Path('.')]
+    exit_code = EXIT_INCOMPLETE if result.get("errors") or result.get("pending_dirs") else EXIT_OK
+
+    # Order the tree and pick the heaviest subtrees from the directory rollups
+    sort_by = getattr(args, 'sort_by', 'name')
+    scanner.sort_tree(result["tree"], sort_by)
+    if getattr(args, 'top_dirs', 0):
+        metric = "size" if sort_by == "size" or result.get("size_only") else "lines"
+        result["top_dirs_metric"] = metric
+        result["top_dirs"] = [
+            {"path": path, "lines": node["lines"], "files": node["files"], "size": node["size"]}
+            for _, path, node in scanner.top_dirs(result["tree"], args.top_dirs, metric)
+        ]
+    if "grep" in result.get("analysis", {}):
+        result["grep_top"] = scanner.file_findings(result["tree"], "grep", getattr(args, 'top', 10))
+    if "hash" in result.get("analysis", {}):
+        result["duplicates"] = scanner.duplicate_groups(result["tree"])[:getattr(args, 'top', 10)]
 
     # JSON output
     if getattr(args, 'json', False):
         payload = json.dumps({
-            "roots": [str(r) for r in roots],
-            "dirs": TOTAL_DIRS,
-            "files": TOTAL_FILES,
-            "total_lines": TOTAL_LINES,
-            "by_ext": dict(LINE_BY_EXT),
+            "roots": result["roots"],
+            "hosts": result.get("hosts", []),
+            "dirs": result["dirs"],
+            "files": result["files"],
+            "total_lines": result["total_lines"],
+            "total_bytes": result["total_bytes"],
+            "by_ext": result["by_ext"],
+            "size_only": result.get("size_only", False),
+            "by_ext_bytes": result.get("by_ext_bytes", {}),
+            "skipped_binary": result["skipped_binary"],
+            "skipped_large": result["skipped_large"],
+            "estimated_files": result["estimated_files"],
+            "unreadable_files": result.get("unreadable_files", 0),
+            "errors": result["errors"],
+            "archives": result.get("archives", 0),
+            "archive_members": result.get("archive_members", 0),
+            "io": {
+                "elapsed": result.get("elapsed", 0.0),
+                "bytes_read": result.get("bytes_read", 0),
+                "bytes_per_sec": result.get("bytes_read", 0) / result["elapsed"] if result.get("elapsed") else 0.0,
+                "files_per_sec": (result["files"] + result.get("filtered_files", 0)) / result["elapsed"]
+                                 if result.get("elapsed") else 0.0,
+                "io_limit_mb_per_sec": result.get("io_limit", 0),
+                "files_per_sec_limit": result.get("files_limit", 0),
+            },
+            "where": result.get("where"),
+            "filtered_files": result.get("filtered_files", 0),
+            "pruned_dirs": result.get("pruned_dirs", 0),
+            "dependencies": {
+                "dirs": result.get("dependency_dirs", 0),
+                "files": result.get("dependency_files", 0),
+                "bytes": result.get("dependency_bytes", 0),
+            },
+            "complete": not result.get("pending_dirs"),
+            "estimated": "estimate" in result,
+            "estimate": estimate_json(result),
+            "pending_dirs": result.get("pending_dirs", 0),
+            "truncated": result.get("truncated", []),
             "largest": [
-                {"lines": lines, "path": str(p)}
-                for lines, p in sorted(LARGEST, reverse=True)[:getattr(args, 'top', 10)]
+                {"lines": lines, "path": path, "estimated": estimated}
+                for lines, path, estimated in result["largest"][:getattr(args, 'top', 10)]
+            ],
+            "largest_bytes": [
+                {"size": size, "path": path}
+                for size, path in result.get("largest_bytes", [])[:getattr(args, 'top', 10)]
             ],
+            "top_dirs": result.get("top_dirs", []),
+            "projects": [
+                dict(project, largest=[{"lines": lines, "path": path} for lines, path in project["largest"]])
+                for project in result.get("projects", [])
+            ],
+            "analysis": result.get("analysis", {}),
+            "grep_top": [{"matches": matches, "path": path} for matches, path in result.get("grep_top", [])],
+            "duplicates": result.get("duplicates", []),
+            "tree": result["tree"],
         }, indent=2)
         print(payload)
         if getattr(args, 'copy', False):
@@ -333,29 +544,36 @@ def main():
             try:
                 Path(args.output).write_text(payload, encoding='utf-8')
             except Exception as e:
-                print(f"[ERROR] Saving JSON output failed: {e}")
-        sys.exit(0)
+                print(f"[ERROR] Saving JSON output failed: {e}", file=sys.stderr)
+                exit_code = EXIT_ERROR
+        return exit_code
 
     # Handle --open-url
     if getattr(args, 'open_url', False):
-        print("[DEBUG] --open-url triggered")
-        ansi_re = re.compile(r"\x1b\[[0-9;]*[mK]")
-        plain_text = ansi_re.sub("", report_str)
+        if not BATCH_MODE:
+            print("[DEBUG] --open-url triggered")
+        plain_text = build_plain_report(result, args)
         html_content = build_html_from_text(plain_text)
         with tempfile.NamedTemporaryFile(suffix=".html", delete=False, mode='w', encoding='utf-8') as tmpf:
             tmpf.write(html_content)
             tmp_path = tmpf.name
-        print(f"[INFO] Opening report in your browser: {tmp_path}")
+        print(f"[INFO] Opening report in your browser: {tmp_path}",
+              file=sys.stderr if BATCH_MODE else sys.stdout)
         webbrowser.open(f'file://{tmp_path}')
-        sys.exit(0)
+        return exit_code
 
     # Print report
-    print("[DEBUG] Printing report")
-    print(report_str)
+    if not BATCH_MODE:
+        print("[DEBUG] Printing report")
+    sys.stdout.flush()
+    render.write_tree(sys.stdout, result["tree"], IS_CLI_MODE, getattr(args, 'BIG_FILE', 300),
+                      getattr(args, 'full_path', False), size_only=result.get("size_only", False))
+    print(build_summary(result, IS_CLI_MODE))
 
     # Save to text file and copy to clipboard if --copy
-    ansi_re = re.compile(r"\x1b\[[0-9;]*[mK]")
-    plain_txt = ansi_re.sub("", report_str)
+    plain_txt = ""
+    if getattr(args, 'copy', False) or getattr(args, 'txt', False):
+        plain_txt = build_plain_report(result, args)
     copied = False
     if getattr(args, 'copy', False):
         copied = copy_clipboard(plain_txt)
@@ -365,26 +583,39 @@ def main():
         try:
             output_path = Path(roots[0]) / "pot_output.txt"
             output_path.write_text(plain_txt, encoding='utf-8')
-            print(f"✓ Report saved to {output_path}")
+            if not BATCH_MODE:
+                print(f"✓ Report saved to {output_path}")
         except Exception as e:
-            print(f"[ERROR] Saving report to text file: {e}")
+            print(f"[ERROR] Saving report to text file: {e}", file=sys.stderr)
+            exit_code = EXIT_ERROR
 
     # Final status messages
-    if copied:
-        print("📋 copied to clipboard")
-    if getattr(args, 'txt', False):
-        print(f"💾 saved → {output_path.relative_to(roots[0])}")
-    else:
-        print(f"💾 (not saved to .txt, only displayed)")
-
-    # Visualization
-    if getattr(args, 'visualize', False):
-        labels = list(LINE_BY_EXT.keys())
-        sizes = list(LINE_BY_EXT.values())
-        plt.figure(figsize=(8,8))
-        plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
-        plt.title("File Types Distribution")
-        plt.show()
+    if not BATCH_MODE:
+        if copied:
+            print("📋 copied to clipboard")
+        if getattr(args, 'txt', False) and exit_code != EXIT_ERROR:
+            print(f"💾 saved → {output_path.relative_to(roots[0])}")
+        else:
+            print(f"💾 (not saved to .txt, only displayed)")
+
+    # Visualization (--save-graph implies --visualize and never opens a window)
+    save_graph = getattr(args, 'save_graph', '')
+    if getattr(args, 'visualize', False) or save_graph:
+        if not save_graph and (BATCH_MODE or clipboard.is_headless()):
+            save_graph = DEFAULT_GRAPH_PATH
+        try:
+            size_only = result.get("size_only", False)
+            if getattr(args, 'graph', 'pie') == 'treemap':
+                metric = "size" if getattr(args, 'sort_by', 'name') == "size" or size_only else "lines"
+                reports.show_treemap(result["tree"], save_graph or None, metric=metric)
+            else:
+                reports.show_pie_chart(result["by_ext_bytes"] if size_only else result["by_ext"],
+                                       save_graph or None)
+        except Exception as e:
+            print(f"[ERROR] Visualization failed: {e}", file=sys.stderr)
+            exit_code = EXIT_ERROR
+
+    return exit_code
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
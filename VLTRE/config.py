@@ -1,14 +1,43 @@
 import argparse
 
+
+def fraction(text):
+    """argparse type for --estimate: a float with 0 < FRACTION <= 1."""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid fraction: {text!r}") from None
+    if not 0 < value <= 1:
+        raise argparse.ArgumentTypeError(f"fraction must be in (0, 1], got {text}")
+    return value
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Directory overview CLI tool: generate source code stats, visualize structure, and more."
     )
     parser.add_argument(
         "root",
-        nargs="?",
-        default=".",
-        help="Root folder to scan (default: current directory '.')"
+        nargs="*",
+        default=["."],
+        help="Root folder(s) to scan (default: current directory '.')"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=0,
+        help="Worker processes used when scanning several roots (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--save-partial",
+        type=str,
+        default="",
+        help="Write the partial scan result to this file for a later 'pot merge'"
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Always scan in-process, even when a 'pot daemon' is running"
     )
     parser.add_argument(
         "-e", "--ext",
@@ -29,11 +58,64 @@ def parse_args():
         default=10,
         help="Number of top largest files to display (default: 10)"
     )
+    parser.add_argument(
+        "--max-file-bytes",
+        type=int,
+        default=50 * 1024 * 1024,
+        help="Skip LOC counting for files larger than this many bytes (default: 50 MiB, 0 for no cap)"
+    )
+    parser.add_argument(
+        "--estimate-large",
+        action="store_true",
+        help="Estimate line counts of files over --max-file-bytes by sampling instead of skipping them"
+    )
+    parser.add_argument(
+        "--size-only",
+        action="store_true",
+        help="Report bytes per file, directory and extension from stat() data only, never opening files"
+    )
+    parser.add_argument(
+        "--archives",
+        action="store_true",
+        help="Scan inside .zip/.whl/.jar/.tar/.tar.gz/.tgz/.tar.bz2/.tar.xz archives as virtual directories"
+    )
+    parser.add_argument(
+        "--archive-depth",
+        type=int,
+        default=2,
+        help="Maximum nesting of archives inside archives to open with --archives (default: 2)"
+    )
+    parser.add_argument(
+        "--grep",
+        type=str,
+        default=None,
+        metavar="PATTERN",
+        help="Count matches of a regular expression in every counted file (same read as LOC)"
+    )
+    parser.add_argument(
+        "--markers",
+        action="store_true",
+        help="Count TODO/FIXME/XXX/HACK markers in every counted file (same read as LOC)"
+    )
+    parser.add_argument(
+        "--hash",
+        nargs="?",
+        const="sha256",
+        default=None,
+        choices=["md5", "sha1", "sha256", "blake2b"],
+        help="Hash the content of every counted file and report duplicates (default algorithm: sha256)"
+    )
     parser.add_argument(
         "--no-color",
         action="store_true",
         help="Disable ANSI colors for better compatibility on some terminals"
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Non-interactive mode: no banner or progress file, colour-free output, "
+             "exit codes 0=ok 1=error 3=incomplete scan (default when stdout is not a TTY)"
+    )
     parser.add_argument(
         "--json",
         action="store_true",
@@ -44,6 +126,27 @@ def parse_args():
         action="store_true",
         help="Include system and dependency files in the report"
     )
+    parser.add_argument(
+        "--where",
+        type=str,
+        default=None,
+        metavar="EXPR",
+        help="Only report files matching a filter, e.g. \"ext == .py and lines > 500 and mtime > 30d "
+             "and path ~ 'src/*'\". Fields: path, name, ext, size, mtime, depth, lines; "
+             "operators: == != < <= > >= ~ (glob); combine with and/or/not and parentheses"
+    )
+    parser.add_argument(
+        "--projects",
+        action="store_true",
+        help="Monorepo mode: find sub-projects (pyproject.toml, setup.py, package.json, ...) during "
+             "the walk and report totals, extensions and largest files per project"
+    )
+    parser.add_argument(
+        "--summarize-deps",
+        action="store_true",
+        help="Show node_modules, venv, site-packages and dist directories as single collapsed "
+             "nodes with file counts and bytes from a stat-only walk"
+    )
     parser.add_argument(
         "--list-drives",
         action="store_true",
@@ -54,6 +157,18 @@ def parse_args():
         action="store_true",
         help="Scan entire drive(s) if no specific root is provided"
     )
+    parser.add_argument(
+        "--sort-by",
+        choices=["name", "lines", "size"],
+        default="name",
+        help="Order tree entries by name, subtree lines or subtree size (default: name)"
+    )
+    parser.add_argument(
+        "--top-dirs",
+        type=int,
+        default=0,
+        help="Report the N heaviest directories by lines (or size with --sort-by size)"
+    )
     parser.add_argument(
         "--full-path",
         action="store_true",
@@ -86,6 +201,70 @@ def parse_args():
         action="store_true",
         help="Enable verbose output for debugging and detailed logs"
     )
+    parser.add_argument(
+        "--estimate",
+        nargs="?",
+        type=fraction,
+        const=0.1,
+        default=None,
+        metavar="FRACTION",
+        help="Open only a random stratified sample of files (0 < FRACTION <= 1, default: 0.1) "
+             "and extrapolate LOC with 95%% confidence intervals. FRACTION is optional, so "
+             "give root folders before --estimate: 'pot src --estimate', not 'pot --estimate src'"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for --estimate, for reproducible samples"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Stop scanning after this many seconds and report partial results, listing "
+             "unvisited directories as truncated (0 for unlimited)"
+    )
+    parser.add_argument(
+        "--io-limit",
+        type=float,
+        default=0,
+        metavar="MB/S",
+        help="Limit file reads to this many MB per second across all workers (0 for unlimited)"
+    )
+    parser.add_argument(
+        "--files-per-sec",
+        type=float,
+        default=0,
+        help="Limit the scan to this many files per second across all workers (0 for unlimited)"
+    )
+    parser.add_argument(
+        "--nice",
+        action="store_true",
+        help="Run at low CPU and I/O priority and drop read files from the page cache (Linux)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default="",
+        metavar="FILE",
+        help="Periodically and atomically save the walk frontier and partial totals to FILE "
+             "(FILE.<n> per root when scanning several roots)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an unfinished scan from the last --checkpoint instead of starting over "
+             "(the checkpoint of a finished scan is ignored)"
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="Minimum seconds between checkpoints (default: 60)"
+    )
     parser.add_argument(
         "--max-depth",
         type=int,
@@ -110,7 +289,123 @@ def parse_args():
     )
     parser.add_argument(
     '--save-graph',
-    action='store_true',
-    help='Save the visualization as an image instead of displaying'
+    type=str,
+    default='',
+    metavar='PATH',
+    help='Save the visualization to an image file (e.g. graph.png) instead of displaying it'
+    )
+    parser.add_argument(
+    '--graph',
+    choices=['pie', 'treemap'],
+    default='pie',
+    help='Visualization type: pie of lines per extension, or treemap of directory lines (default: pie)'
+    )
+    return parser.parse_args()
+
+def parse_merge_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pot merge",
+        description="Combine partial results written with --save-partial into a single report."
+    )
+    parser.add_argument(
+        "partials",
+        nargs="+",
+        help="Partial result files to merge"
+    )
+    parser.add_argument(
+        "-n", "--top",
+        type=int,
+        default=10,
+        help="Number of top largest files to display (default: 10)"
+    )
+    parser.add_argument(
+        "--no-color",
+        action="store_true",
+        help="Disable ANSI colors for better compatibility on some terminals"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Non-interactive mode: no banner or progress file, colour-free output, "
+             "exit codes 0=ok 1=error 3=incomplete scan (default when stdout is not a TTY)"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output the merged report as JSON"
+    )
+    parser.add_argument(
+        "--sort-by",
+        choices=["name", "lines", "size"],
+        default="name",
+        help="Order tree entries by name, subtree lines or subtree size (default: name)"
+    )
+    parser.add_argument(
+        "--top-dirs",
+        type=int,
+        default=0,
+        help="Report the N heaviest directories by lines (or size with --sort-by size)"
+    )
+    parser.add_argument(
+        "--full-path",
+        action="store_true",
+        help="Show full absolute path of each root directory"
+    )
+    parser.add_argument(
+        "--copy",
+        action="store_true",
+        help="Copy the report output to clipboard"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="",
+        help="Specify output file path for the JSON report (default: none)"
+    )
+    parser.add_argument(
+        "--save-partial",
+        type=str,
+        default="",
+        help="Write the merged result as a new partial result file"
+    )
+    parser.add_argument(
+        "--save-graph",
+        type=str,
+        default="",
+        metavar="PATH",
+        help="Save a visualization of the merged result to an image file"
+    )
+    parser.add_argument(
+        "--graph",
+        choices=["pie", "treemap"],
+        default="pie",
+        help="Visualization type for --save-graph (default: pie)"
+    )
+    return parser.parse_args(argv)
+
+def parse_daemon_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pot daemon",
+        description="Keep scan results for repeatedly queried roots in memory and serve them "
+                    "over a Unix domain socket; 'pot' uses it automatically when it is running."
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Socket path (default: $POT_DAEMON_SOCKET or ~/.pot_daemon.sock)"
+    )
+    parser.add_argument(
+        "--refresh",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="Serve a result without revalidating it for up to SECONDS after the last scan "
+             "(default: 2; 0 revalidates on every request; unchanged files are never reopened)"
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop a running daemon"
     )
-    return parser.parse_args()
\ No newline at end of file
+    return parser.parse_args(argv)
@@ -0,0 +1,161 @@
+# counting.py
+
+import os
+
+# Size of the leading block used to sniff binary content
+SNIFF_BYTES = 8192
+# Fraction of non-text bytes in the leading block above which a file is binary
+BINARY_RATIO = 0.30
+# Number and size of the chunks read when estimating a huge file
+SAMPLE_CHUNKS = 16
+SAMPLE_CHUNK_BYTES = 64 * 1024
+# Size of each read of a counted file, so that --io-limit is charged before every read
+READ_CHUNK_BYTES = 1024 * 1024
+
+# Bytes that commonly appear in text files (printable ASCII, whitespace, UTF-8 high bytes)
+_TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x7f)) | set(range(0x80, 0x100)))
+
+
+def is_binary(block):
+    """Return True if a leading block of bytes looks like binary content."""
+    if not block:
+        return False
+    if b"\0" in block:
+        return True
+    non_text = len(block.translate(None, _TEXT_BYTES))
+    return non_text / len(block) > BINARY_RATIO
+
+
+def count_nonblank(data):
+    """Count the non-blank lines in a bytes buffer."""
+    return sum(1 for line in data.splitlines() if line.strip())
+
+
+def read_bytes(f, count, bucket=None):
+    """
+    Read up to count bytes from a binary stream in READ_CHUNK_BYTES chunks.
+    Each chunk is taken from the throttle bucket before it is read, so a
+    single read never runs ahead of the --io-limit budget.
+    """
+    parts = []
+    while count > 0:
+        want = min(count, READ_CHUNK_BYTES)
+        if bucket is not None:
+            bucket.acquire(want, 0)
+        chunk = f.read(want)
+        if not chunk:
+            break
+        parts.append(chunk)
+        count -= len(chunk)
+    return b"".join(parts)
+
+
+def estimate_lines(f, size, bucket=None):
+    """
+    Estimate the non-blank line count of an open binary file of the given size
+    by reading evenly spaced chunks and extrapolating the line density.
+    A non-blank file always has at least one line, even when no sampled chunk
+    contains a newline (e.g. a minified single-line JSON dump).
+    """
+    step = max(size // SAMPLE_CHUNKS, SAMPLE_CHUNK_BYTES)
+    sampled = 0
+    lines = 0
+    text = False
+    for offset in range(0, size, step):
+        f.seek(offset)
+        chunk = read_bytes(f, min(SAMPLE_CHUNK_BYTES, size - offset), bucket)
+        if not chunk:
+            break
+        text = text or bool(chunk.strip())
+        # Drop the partial lines at both ends of the chunk
+        start = chunk.find(b"\n") + 1 if offset else 0
+        end = chunk.rfind(b"\n") + 1
+        if end <= start:
+            # The chunk lies inside one long line: bytes sampled, no line ends
+            sampled += len(chunk)
+            continue
+        lines += count_nonblank(chunk[start:end])
+        sampled += end - start
+    if not sampled:
+        return 0
+    return max(int(lines * size / sampled), 1 if text else 0)
+
+
+def seekable(f):
+    """
+    Return True if a stream supports seek(). Members of a tar archive read
+    as a stream raise instead of returning False, so that counts as no.
+    """
+    try:
+        return f.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def analyze_stream(f, analyzers, size, max_bytes=0, estimate=False, bucket=None):
+    """
+    Sniff, read once and analyze an open binary stream of the given size.
+    Only the first size bytes are read, in chunks charged to bucket.
+    Returns (values, status) as described in analyze_file().
+    """
+    head = read_bytes(f, min(size, SNIFF_BYTES), bucket)
+    if is_binary(head):
+        return {}, "binary"
+    if max_bytes and size > max_bytes:
+        if estimate and seekable(f):
+            return {"lines": estimate_lines(f, size, bucket)}, "estimated"
+        return {}, "too_large"
+    data = head + read_bytes(f, size - len(head), bucket) if len(head) == SNIFF_BYTES else head
+    return {a.name: a.analyze(data) for a in analyzers}, "counted"
+
+
+def bytes_read(status, size):
+    """Return roughly how many bytes analyze_file() read for a file of this size and status."""
+    if status == "counted":
+        return size
+    if status == "estimated":
+        return min(size, SNIFF_BYTES + SAMPLE_CHUNKS * SAMPLE_CHUNK_BYTES)
+    if status in ("binary", "too_large"):
+        return min(size, SNIFF_BYTES)
+    return 0
+
+
+def drop_from_cache(f):
+    """Tell the kernel an open file's pages will not be needed again, where supported."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def analyze_file(path, analyzers, max_bytes=0, estimate=False, size=None, opener=None,
+                 drop_cache=False, bucket=None):
+    """
+    Read a file once and feed its bytes to every analyzer.
+
+    Returns a (values, status) tuple where values maps analyzer names to
+    their results and status is one of:
+      "counted"   – the whole file was read and analyzed
+      "binary"    – the leading block looked binary, nothing analyzed
+      "too_large" – the file exceeds max_bytes and was skipped
+      "estimated" – the file exceeds max_bytes; only "lines" was sampled
+      "error"     – the file could not be read
+
+    Pass size when the caller already has it from a stat() to avoid another
+    one, and opener to read from somewhere other than the filesystem (for
+    example an archive member). With drop_cache, the file's pages are
+    released from the page cache once it has been read. bucket is the
+    --io-limit throttle.TokenBucket, charged before each chunk is read.
+    """
+    try:
+        if size is None:
+            size = os.path.getsize(path)
+        with (opener() if opener else open(path, "rb")) as f:
+            try:
+                return analyze_stream(f, analyzers, size, max_bytes, estimate, bucket)
+            finally:
+                if drop_cache and opener is None:
+                    drop_from_cache(f)
+    except Exception:
+        return {}, "error"
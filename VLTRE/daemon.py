@@ -0,0 +1,229 @@
+# daemon.py
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+
+from VLTRE import scanner
+
+SOCKET_PATH = os.environ.get("POT_DAEMON_SOCKET") or os.path.expanduser("~/.pot_daemon.sock")
+# Seconds a result is served without revalidating it (0: revalidate on every request).
+# Repeat queries within this window (shell prompts, editor hooks) skip the rescan entirely
+DEFAULT_REFRESH = 2.0
+# Seconds after which a root that was not queried is dropped from memory
+IDLE_TIMEOUT = 600.0
+# Seconds between checks for idle roots
+EVICT_INTERVAL = 60.0
+# Seconds the CLI waits to connect to the daemon before falling back to an in-process scan
+CONNECT_TIMEOUT = 5.0
+
+# Arguments the daemon cannot serve; the CLI scans in-process when they are set
+LOCAL_ONLY_OPTIONS = ("time_budget", "estimate", "checkpoint", "io_limit", "files_per_sec", "nice")
+
+
+def available():
+    """Return True if this platform supports Unix domain sockets."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def can_serve(args):
+    """Return True if the daemon can answer a scan for these arguments."""
+    return available() and not any(getattr(args, key, None) for key in LOCAL_ONLY_OPTIONS)
+
+
+class Entry:
+    """Cached scan result for one root and one set of scan options."""
+
+    def __init__(self, root, options):
+        self.root = root
+        self.args = argparse.Namespace(**options)
+        self.cache = {}
+        self.result = None
+        self.payload = None
+        self.scanned = 0.0
+        self.used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def get(self, max_age):
+        """
+        Return the serialised result, rescanning first unless it is younger
+        than max_age seconds. The rescan lists every directory again but only
+        reopens files and archives whose size or mtime changed, and the result
+        is serialised again only when it differs from the last one.
+        """
+        with self.lock:
+            self.used = time.monotonic()
+            if self.payload is None or time.monotonic() - self.scanned >= max_age:
+                result = scanner.scan_root(self.root, self.args, cache=self.cache)
+                # elapsed differs on every scan; an otherwise equal result keeps its payload
+                compared = dict(result, elapsed=None)
+                if compared != self.result:
+                    self.result = compared
+                    self.payload = json.dumps(result).encode("utf-8")
+                self.scanned = time.monotonic()
+            return self.payload
+
+
+class ScanDaemon:
+    """Holds scan results for queried roots and revalidates them on request."""
+
+    def __init__(self, refresh=DEFAULT_REFRESH, idle_timeout=IDLE_TIMEOUT):
+        self.max_age = refresh
+        self.idle_timeout = idle_timeout
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def get(self, root, options):
+        """Return the serialised result for a root, scanning or revalidating it as needed."""
+        key = (root, json.dumps(options, sort_keys=True))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = Entry(root, options)
+        return entry.get(self.max_age)
+
+    def evict(self):
+        """Drop the results of roots that were not queried for idle_timeout seconds."""
+        now = time.monotonic()
+        with self.lock:
+            for key, entry in list(self.entries.items()):
+                if now - entry.used >= self.idle_timeout and not entry.lock.locked():
+                    del self.entries[key]
+
+    def evict_loop(self):
+        while not self.stopping.wait(min(EVICT_INTERVAL, self.idle_timeout)):
+            self.evict()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            op = request.get("op")
+            if op == "scan":
+                self.wfile.write(self.server.daemon.get(request["root"], request["options"]))
+            elif op == "ping":
+                self.wfile.write(b'{"ok": true}')
+            elif op == "stop":
+                self.wfile.write(b'{"ok": true}')
+                self.server.daemon.stopping.set()
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+        except Exception as e:
+            print(f"[ERROR] Daemon request failed: {e}", file=sys.stderr)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _connect(socket_path, timeout=CONNECT_TIMEOUT):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _call(request, socket_path=SOCKET_PATH, timeout=None):
+    """
+    Send one request and return the decoded response. timeout also bounds the
+    wait for the response; None waits for as long as the daemon takes, since
+    the first scan of a large root may run for minutes and scanning it
+    in-process meanwhile would only do the same work twice.
+    """
+    with _connect(socket_path, timeout or CONNECT_TIMEOUT) as sock:
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(1 << 20)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def serve(socket_path=SOCKET_PATH, refresh=DEFAULT_REFRESH):
+    """Run the daemon in the foreground until stopped."""
+    if os.path.exists(socket_path):
+        try:
+            _call({"op": "ping"}, socket_path, timeout=1.0)
+            print(f"[ERROR] A pot daemon is already listening on {socket_path}", file=sys.stderr)
+            return 1
+        except (OSError, ValueError):
+            os.unlink(socket_path)  # stale socket from a daemon that did not exit cleanly
+    daemon = ScanDaemon(refresh)
+    old_umask = os.umask(0o077)  # only the current user may connect
+    try:
+        server = _Server(socket_path, _Handler)
+    finally:
+        os.umask(old_umask)
+    server.daemon = daemon
+    threading.Thread(target=daemon.evict_loop, daemon=True).start()
+    print(f"[INFO] pot daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stopping.set()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+    return 0
+
+
+def stop(socket_path=SOCKET_PATH):
+    """Ask a running daemon to exit; return True if one answered."""
+    try:
+        _call({"op": "stop"}, socket_path, timeout=5.0)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _relabel(path, real_root, given_root):
+    """Rewrite a path under the absolute root into the form an in-process scan reports."""
+    if given_root == real_root:
+        return path
+    if path == real_root:
+        return given_root
+    prefix = real_root if real_root.endswith(os.sep) else real_root + os.sep
+    if path.startswith(prefix):
+        return os.path.join(given_root, path[len(prefix):])
+    return path
+
+
+def try_scan(roots, args, socket_path=SOCKET_PATH):
+    """
+    Ask a running daemon for the results of these roots. Returns the merged
+    result, or None when no daemon is running or it cannot serve the request,
+    in which case the caller scans in-process.
+    """
+    if not can_serve(args) or not os.path.exists(socket_path):
+        return None
+    options = scanner.scan_options(args)
+    parts = []
+    try:
+        for root in roots:
+            given = str(root)
+            real = os.path.abspath(given)
+            part = _call({"op": "scan", "root": real, "options": options}, socket_path)
+            # The daemon walks absolute paths; report paths as the user gave them
+            for item in part["largest"] + part.get("largest_bytes", []):
+                item[1] = _relabel(item[1], real, given)
+            part["truncated"] = [_relabel(p, real, given) for p in part.get("truncated", [])]
+            parts.append(part)
+    except (OSError, ValueError, KeyError):
+        return None
+    return scanner.merge_results(parts, getattr(args, 'top', 10))
@@ -4,14 +4,16 @@ import tempfile
 from VLTRE import tree_progress
 
 # Define your color codes for CLI mode
+COLOR_CODES = {
+    "reset": "\033[0m",
+    "big": "\033[31m",     # Red
+    "dir": "\033[36m",     # Cyan
+    "file": "\033[32m",    # Green
+    "skipped": "\033[37m", # White
+    "root": "\033[35;1m",  # Bright magenta
+}
+
 def colour(role, text, cli_mode=True):
-    COLOR_CODES = {
-        "reset": "\033[0m",
-        "big": "\033[31m",     # Red
-        "dir": "\033[36m",     # Cyan
-        "file": "\033[32m",    # Green
-        "skipped": "\033[37m", # White
-    }
     if cli_mode:
         color_code = COLOR_CODES.get(role, "")
         return f"{color_code}{text}{COLOR_CODES['reset']}"
@@ -0,0 +1,237 @@
+# filters.py
+
+import re
+import time
+from datetime import datetime
+from fnmatch import fnmatchcase
+
+# Fields a --where expression can test
+STRING_FIELDS = ("path", "name", "ext")
+NUMBER_FIELDS = ("size", "mtime", "depth", "lines")
+OPERATORS = ("==", "!=", "<", "<=", ">", ">=", "~")
+
+_TOKEN = re.compile(r"""\s*(?:(\(|\)|==|!=|<=|>=|=|<|>|~)|"([^"]*)"|'([^']*)'|([^\s()<>=!~"']+))""")
+_SIZE = re.compile(r"(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?", re.IGNORECASE)
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)([smhdw])", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"unexpected character at position {pos}: {text[pos:]!r}")
+        op, dq, sq, word = match.groups()
+        if op is not None:
+            tokens.append(("op", "==" if op == "=" else op))
+        elif dq is not None or sq is not None:
+            tokens.append(("word", dq if dq is not None else sq))
+        else:
+            tokens.append(("word", word))
+        pos = match.end()
+    return tokens
+
+
+def _value(field, op, text):
+    """Convert a literal to the type its field is compared as."""
+    if field in STRING_FIELDS:
+        if op not in ("==", "!=", "~"):
+            raise ValueError(f"'{field}' supports ==, != and ~ only")
+        if field == "ext":
+            text = text.lower()
+            if text and not text.startswith(".") and not any(c in text for c in "*?["):
+                text = "." + text
+        return text
+    if op == "~":
+        raise ValueError(f"'~' (glob match) does not apply to '{field}'")
+    if field == "size":
+        match = _SIZE.fullmatch(text)
+        if not match:
+            raise ValueError(f"invalid size: {text!r} (e.g. 500, 10k, 2MB)")
+        return float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()]
+    if field == "mtime":
+        # A duration means that long ago, so 'mtime > 30d' is "modified in the last 30 days"
+        match = _DURATION.fullmatch(text)
+        if match:
+            return time.time() - float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+        try:
+            return datetime.fromisoformat(text).timestamp()
+        except ValueError:
+            raise ValueError(f"invalid mtime: {text!r} (e.g. 30d, 12h, 2024-01-31)") from None
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"invalid number for '{field}': {text!r}") from None
+
+
+def parse(text):
+    """
+    Parse a --where expression into nested tuples:
+      ("or", a, b), ("and", a, b), ("not", a), ("cmp", field, op, value)
+
+    Grammar: comparisons `FIELD OP VALUE` combined with and/or/not and
+    parentheses. Fields: path, name, ext, size, mtime, depth, lines.
+    Raises ValueError with a readable message on a malformed expression.
+    """
+    tokens = _tokenize(text)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
+
+    def keyword(word):
+        kind, value = peek()
+        return kind == "word" and value.lower() == word
+
+    def take():
+        nonlocal pos
+        if pos >= len(tokens):
+            raise ValueError("unexpected end of expression")
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or():
+        node = parse_and()
+        while keyword("or"):
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while keyword("and"):
+            take()
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        if keyword("not"):
+            take()
+            return ("not", parse_not())
+        if peek() == ("op", "("):
+            take()
+            node = parse_or()
+            if take() != ("op", ")"):
+                raise ValueError("expected ')'")
+            return node
+        kind, field = take()
+        if kind != "word" or field.lower() not in STRING_FIELDS + NUMBER_FIELDS:
+            raise ValueError(f"unknown field {field!r} (use one of: {', '.join(STRING_FIELDS + NUMBER_FIELDS)})")
+        field = field.lower()
+        kind, op = take()
+        if kind != "op" or op not in OPERATORS:
+            raise ValueError(f"expected an operator after {field!r}, got {op!r}")
+        kind, literal = take()
+        if kind != "word":
+            raise ValueError(f"expected a value after '{field} {op}'")
+        return ("cmp", field, op, _value(field, op, literal))
+
+    if not tokens:
+        raise ValueError("empty expression")
+    node = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f"unexpected {tokens[pos][1]!r}")
+    return node
+
+
+def _compare(actual, op, expected):
+    if op == "~":
+        return fnmatchcase(actual, expected)
+    if op == "==":
+        return actual == expected
+    if op == "!=":
+        return actual != expected
+    if op == "<":
+        return actual < expected
+    if op == "<=":
+        return actual <= expected
+    if op == ">":
+        return actual > expected
+    return actual >= expected
+
+
+def _combine(node, test):
+    """Kleene three-valued and/or/not over a per-comparison test."""
+    kind = node[0]
+    if kind == "cmp":
+        return test(node)
+    if kind == "not":
+        value = _combine(node[1], test)
+        return None if value is None else not value
+    left = _combine(node[1], test)
+    if kind == "and":
+        if left is False:
+            return False
+        right = _combine(node[2], test)
+        if right is False:
+            return False
+        return None if left is None or right is None else True
+    if left is True:
+        return True
+    right = _combine(node[2], test)
+    if right is True:
+        return True
+    return None if left is None or right is None else False
+
+
+def matches_file(node, facts):
+    """
+    Evaluate an expression for one file. facts maps field names to values;
+    a field missing from facts is not known yet (e.g. lines before the file
+    is read) and makes the comparisons on it undecided. A field present with
+    the value None (lines of a file that was not counted) never matches.
+    Returns True, False, or None when the answer depends on missing facts.
+    """
+    def test(cmp):
+        _, field, op, expected = cmp
+        if field not in facts:
+            return None
+        actual = facts[field]
+        if actual is None:
+            return False
+        return _compare(actual, op, expected)
+    return _combine(node, test)
+
+
+def _literal_prefix(pattern):
+    for i, c in enumerate(pattern):
+        if c in "*?[":
+            return pattern[:i]
+    return pattern
+
+
+def matches_dir(node, rel_path, depth):
+    """
+    Decide an expression for every file below a directory at once, from
+    its relative path and depth alone. Returns False when no file below can
+    match (the directory need not be listed), True when every file below
+    matches, and None otherwise.
+    """
+    prefix = rel_path + "/"
+
+    def test(cmp):
+        _, field, op, expected = cmp
+        if field == "path":
+            if op == "!=":
+                return None
+            literal = _literal_prefix(expected) if op == "~" else expected
+            if not (literal.startswith(prefix) or prefix.startswith(literal)):
+                return False
+            if op == "~" and expected == literal + "*" and prefix.startswith(literal):
+                return True
+            return None
+        if field == "depth":
+            # Files below the directory are at least one level deeper
+            least = depth + 1
+            if op in ("<", "<=", "=="):
+                return False if (least >= expected if op == "<" else least > expected) else None
+            if op in (">", ">="):
+                return True if (least > expected if op == ">" else least >= expected) else None
+            if op == "!=":
+                return True if least > expected else None
+        return None
+    return _combine(node, test)
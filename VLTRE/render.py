@@ -0,0 +1,160 @@
+# render.py
+
+from pathlib import Path
+
+from VLTRE.display import COLOR_CODES
+
+# Visible column at which LOC counts start (prefix + name are padded to this width)
+NAME_COLUMN = 44
+# Number of lines gathered before each write to the output stream
+BATCH_LINES = 8192
+
+BRANCH = "├── "
+LAST_BRANCH = "└── "
+PIPE = "│   "
+SPACE = "    "
+
+
+def _style_table(cli_mode):
+    """Return role -> (start, end) escape sequences for the given mode."""
+    if not cli_mode:
+        return {role: ("", "") for role in COLOR_CODES}
+    reset = COLOR_CODES["reset"]
+    return {role: (code, reset) for role, code in COLOR_CODES.items()}
+
+
+STYLES = {True: _style_table(True), False: _style_table(False)}
+
+
+def format_bytes(size):
+    """Return a short human-readable byte count (e.g. '12.3 MB')."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _dir_suffix(node, size_only=False):
+    """Return the subtree rollup column for a directory node."""
+    mark = "  [truncated]" if node.get("truncated") else ""
+    if node.get("archive"):
+        mark += "  [archive]"
+    if node.get("dependency"):
+        mark += "  [dependencies]"
+    if "files" not in node:
+        return mark.lstrip()
+    if size_only:
+        return f"{format_bytes(node['size']):>10}  ({node['files']:,} files){mark}"
+    return f"{node['lines']:>7}  ({node['files']:,} files, {format_bytes(node['size'])}){mark}"
+
+
+def iter_chunks(nodes, cli_mode=True, big_file=300, batch=BATCH_LINES, size_only=False):
+    """
+    Yield lists of rendered tree lines for scanner nodes, roughly `batch` lines
+    at a time, without recursion. Prefixes are cached per depth, so each
+    directory costs one string concatenation and each entry none; padding and
+    LOC columns come from lookup tables instead of per-entry formatting.
+    With size_only, files and directories show bytes instead of LOC.
+    """
+    styles = STYLES[bool(cli_mode)]
+    dir_start, dir_end = styles["dir"]
+    file_start, file_end = styles["file"]
+    big_start, big_end = styles["big"]
+    skip_start, skip_end = styles["skipped"]
+    pads = [" " * n for n in range(NAME_COLUMN + 1)]
+    counts = {}
+
+    out = []
+    append = out.append
+    # cont[d] is the continuation prefix for entries at depth d;
+    # branches[d] holds the (middle, last) connector prefixes for that depth
+    cont = [""]
+    branches = [(BRANCH, LAST_BRANCH)]
+    stack = [(nodes, 0)]
+    while stack:
+        children, start = stack.pop()
+        d = len(stack)
+        middle, last_prefix = branches[d]
+        width = 4 * (d + 1)
+        final = len(children) - 1
+        for index in range(start, final + 1):
+            node = children[index]
+            prefix = last_prefix if index == final else middle
+            name = node["name"]
+            if node["type"] == "dir":
+                suffix = _dir_suffix(node, size_only)
+                if suffix:
+                    pad = NAME_COLUMN - width - len(name) - 1
+                    pad = pads[pad] if pad > 0 else " "
+                    append(f"{prefix}{dir_start}{name}{dir_end}/{pad}{suffix}")
+                else:
+                    append(f"{prefix}{dir_start}{name}{dir_end}/")
+                grandchildren = node.get("children")
+                if grandchildren:
+                    child_cont = cont[d] + (SPACE if index == final else PIPE)
+                    del cont[d + 1:], branches[d + 1:]
+                    cont.append(child_cont)
+                    branches.append((child_cont + BRANCH, child_cont + LAST_BRANCH))
+                    stack.append((children, index + 1))
+                    stack.append((grandchildren, 0))
+                    break
+                continue
+            if size_only:
+                pad = NAME_COLUMN - width - len(name)
+                pad = pads[pad] if pad > 0 else " "
+                append(f"{prefix}{file_start}{name}{file_end}{pad}{format_bytes(node.get('size', 0)):>10}")
+                continue
+            lines = node.get("lines", 0)
+            status = node.get("status")
+            if status == "estimated" or status == "extrapolated":
+                suffix = f"~{lines:>6}"
+            elif status == "binary" or status == "too_large":
+                suffix = f"{skip_start}{status:>7}{skip_end}"
+            elif lines:
+                suffix = counts.get(lines)
+                if suffix is None:
+                    suffix = counts[lines] = f"{lines:>7}"
+            else:
+                append(f"{prefix}{file_start}{name}{file_end}")
+                continue
+            pad = NAME_COLUMN - width - len(name)
+            pad = pads[pad] if pad > 0 else " "
+            if lines >= big_file:
+                append(f"{prefix}{big_start}{name}{big_end}{pad}{suffix}")
+            else:
+                append(f"{prefix}{file_start}{name}{file_end}{pad}{suffix}")
+        if len(out) >= batch:
+            yield out
+            out = []
+            append = out.append
+    if out:
+        yield out
+
+
+def iter_report_chunks(tree, cli_mode=True, big_file=300, full_path=False, batch=BATCH_LINES,
+                       size_only=False):
+    """Yield line chunks for every root node followed by its tree."""
+    start, end = STYLES[bool(cli_mode)]["root"]
+    for root_node in tree:
+        root_path_str = root_node["name"]
+        root_disp = root_path_str if full_path else (Path(root_path_str).name or root_path_str)
+        suffix = _dir_suffix(root_node, size_only)
+        if suffix:
+            suffix = " " * max(1, NAME_COLUMN - 4 - len(root_disp)) + suffix
+        yield [f"{start}{BRANCH}{root_disp}{end}{suffix}"]
+        yield from iter_chunks(root_node["children"], cli_mode, big_file, batch, size_only)
+
+
+def render_tree(tree, cli_mode=True, big_file=300, full_path=False, size_only=False):
+    """Return the rendered report tree as a single string."""
+    return "\n".join(line for chunk in iter_report_chunks(tree, cli_mode, big_file, full_path,
+                                                         size_only=size_only)
+                     for line in chunk)
+
+
+def write_tree(stream, tree, cli_mode=True, big_file=300, full_path=False, batch=BATCH_LINES,
+               size_only=False):
+    """Write the rendered report tree to a stream, one write per chunk of lines."""
+    for chunk in iter_report_chunks(tree, cli_mode, big_file, full_path, batch, size_only):
+        chunk.append("")
+        stream.write("\n".join(chunk))
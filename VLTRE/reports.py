@@ -1,7 +1,8 @@
 # reports.py
 
+import sys
 import json
-import matplotlib.pyplot as plt
+import heapq
 import tempfile
 import os
 import webbrowser
@@ -40,18 +41,161 @@ def generate_json_report(data, output_path=None, copy=False):
         try:
             Path(output_path).write_text(payload, encoding='utf-8')
         except Exception as e:
-            print(f"[ERROR] Saving JSON output failed: {e}")
+            print(f"[ERROR] Saving JSON output failed: {e}", file=sys.stderr)
     if copy:
         clipboard.copy_clipboard(payload)
     return payload
 
-def show_pie_chart(line_by_ext):
-    labels = list(line_by_ext.keys())
-    sizes = list(line_by_ext.values())
+# Pie slices below this share of the total are folded into "other"
+MIN_SLICE_SHARE = 0.02
+MAX_SLICES = 10
+# Upper bound on treemap rectangles, independent of the number of files
+MAX_TREEMAP_RECTS = 64
+
+
+def _pyplot(headless=False):
+    """Import pyplot on demand, selecting the non-interactive Agg backend when headless."""
+    import matplotlib
+    if headless:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def fold_small(values, max_items=MAX_SLICES, min_share=MIN_SLICE_SHARE):
+    """
+    Return (label, value) pairs for the largest entries of a dict, folding
+    entries below min_share of the total (or beyond max_items) into "other".
+    """
+    total = sum(values.values())
+    items = sorted(((v, k) for k, v in values.items() if v > 0), reverse=True)
+    kept = []
+    other = 0
+    for value, label in items:
+        if len(kept) < max_items - 1 and total and value / total >= min_share:
+            kept.append((label, value))
+        else:
+            other += value
+    if other:
+        kept.append(("other", other))
+    return kept
+
+
+def _finish(plt, save_path):
+    if save_path:
+        plt.savefig(save_path, bbox_inches="tight")
+        plt.close()
+        # Status goes to stderr so that stdout carries only the report
+        print(f"[INFO] Graph saved to {save_path}", file=sys.stderr)
+    else:
+        plt.show()
+
+
+def show_pie_chart(line_by_ext, save_path=None):
+    slices = fold_small(line_by_ext)
+    if not slices:
+        print("[INFO] No counted lines to visualize.", file=sys.stderr)
+        return
+    plt = _pyplot(headless=bool(save_path))
+    labels = [label for label, _ in slices]
+    sizes = [value for _, value in slices]
     plt.figure(figsize=(8,8))
     plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
     plt.title("File Types Distribution")
-    plt.show()
+    _finish(plt, save_path)
+
+
+def treemap_items(tree, max_rects=MAX_TREEMAP_RECTS, metric="lines"):
+    """
+    Pre-aggregate a scanner tree into at most max_rects (label, value) items.
+    The heaviest directory is repeatedly replaced by its children until the
+    budget is used; only directory rollups are read, never every file.
+    """
+    counter = 0
+    heap = []
+    items = []
+
+    def push(label, node):
+        nonlocal counter
+        counter += 1
+        heapq.heappush(heap, (-node.get(metric, 0), counter, label, node))
+
+    for root_node in tree:
+        push(root_node["name"], root_node)
+    while heap:
+        value, _, label, node = heapq.heappop(heap)
+        children = [c for c in node.get("children", []) if c.get(metric, 0) > 0]
+        room = max_rects - len(items) - len(heap)
+        if node["type"] != "dir" or not children or len(children) > room:
+            items.append((label, -value))
+            continue
+        for child in children:
+            push(os.path.join(label, child["name"]), child)
+    items = [(label, value) for label, value in items if value > 0]
+    items.sort(key=lambda item: item[1], reverse=True)
+    if len(items) > max_rects:
+        rest = sum(value for _, value in items[max_rects - 1:])
+        items = items[:max_rects - 1] + [("other", rest)]
+    return items
+
+
+def _worst(row, side):
+    total = sum(row)
+    return max(max(side * side * r / (total * total), total * total / (side * side * r)) for r in row)
+
+
+def squarify(values, x, y, width, height):
+    """Lay out descending positive values as squarified treemap rectangles."""
+    total = sum(values)
+    areas = [v * width * height / total for v in values]
+    rects = []
+    while areas:
+        side = min(width, height)
+        row = [areas[0]]
+        i = 1
+        while i < len(areas) and _worst(row + [areas[i]], side) <= _worst(row, side):
+            row.append(areas[i])
+            i += 1
+        thickness = sum(row) / side
+        offset = 0
+        for area in row:
+            length = area / thickness
+            if width >= height:
+                rects.append((x, y + offset, thickness, length))
+            else:
+                rects.append((x + offset, y, length, thickness))
+            offset += length
+        if width >= height:
+            x += thickness
+            width -= thickness
+        else:
+            y += thickness
+            height -= thickness
+        areas = areas[i:]
+    return rects
+
+
+def show_treemap(tree, save_path=None, max_rects=MAX_TREEMAP_RECTS, metric="lines"):
+    items = treemap_items(tree, max_rects, metric)
+    if not items:
+        print("[INFO] No counted lines to visualize.", file=sys.stderr)
+        return
+    plt = _pyplot(headless=bool(save_path))
+    from matplotlib.patches import Rectangle
+    rects = squarify([value for _, value in items], 0, 0, 100, 100)
+    fig, ax = plt.subplots(figsize=(12, 8))
+    cmap = plt.get_cmap("tab20")
+    for index, ((label, value), (x, y, w, h)) in enumerate(zip(items, rects)):
+        ax.add_patch(Rectangle((x, y), w, h, facecolor=cmap(index % 20), edgecolor="white"))
+        if w > 8 and h > 4:
+            ax.text(x + w / 2, y + h / 2, f"{os.path.basename(label) or label}\n{value:,}",
+                    ha="center", va="center", fontsize=8, clip_on=True)
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 100)
+    ax.set_axis_off()
+    ax.set_title(f"Directory {metric} treemap")
+    _finish(plt, save_path)
+
 
 def open_html_in_browser(html_content):
     with tempfile.NamedTemporaryFile(suffix=".html", delete=False, mode='w', encoding='utf-8') as tmpf:
@@ -0,0 +1,82 @@
+# sampling.py
+
+import math
+import random
+
+# Default fraction of files opened by a bare --estimate
+DEFAULT_FRACTION = 0.1
+# Every stratum opens at least this many files so that it has a ratio to extrapolate from
+MIN_SAMPLES = 3
+# z-score for the reported 95% confidence intervals
+Z_95 = 1.96
+
+# Indexes into a stratum accumulator list (kept as a list so results stay JSON-serialisable)
+N, X, n, SX, SY, SXX, SXY, SYY = range(8)
+
+
+def stratum_key(ext, size):
+    """Stratify by extension and by size bucket (each bucket spans a factor of 4)."""
+    return f"{ext}|{size.bit_length() // 2}"
+
+
+def new_stratum():
+    return [0] * 8
+
+
+def make_rng(seed, root):
+    """Return a random generator; a fixed seed gives a reproducible sample per root."""
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}:{root}")
+
+
+def should_sample(stratum, fraction, rng):
+    """Decide whether the next file of a stratum is opened."""
+    return stratum[n] < MIN_SAMPLES or rng.random() < fraction
+
+
+def add_file(stratum, size):
+    """Count a file of the stratum population (sampled or not)."""
+    stratum[N] += 1
+    stratum[X] += size
+
+
+def add_sample(stratum, size, lines):
+    """Record the exact line count of a sampled file."""
+    stratum[n] += 1
+    stratum[SX] += size
+    stratum[SY] += lines
+    stratum[SXX] += size * size
+    stratum[SXY] += size * lines
+    stratum[SYY] += lines * lines
+
+
+def ratio(stratum):
+    """Lines per byte observed in the stratum's sample."""
+    if stratum[SX]:
+        return stratum[SY] / stratum[SX]
+    return 0.0
+
+
+def estimate(stratum):
+    """
+    Return (total_lines, variance) for a stratum using the ratio estimator
+    total = R * X, where X is the stratum's total bytes from stat().
+    """
+    if not stratum[n]:
+        return 0.0, 0.0
+    r = ratio(stratum)
+    total = r * stratum[X]
+    if stratum[n] >= stratum[N]:
+        return float(stratum[SY]), 0.0
+    if stratum[n] < 2:
+        # Too few samples to estimate a spread; report the whole estimate as uncertain
+        return total, total * total
+    residual = (stratum[SYY] - 2 * r * stratum[SXY] + r * r * stratum[SXX]) / (stratum[n] - 1)
+    variance = stratum[N] ** 2 * (1 - stratum[n] / stratum[N]) * max(residual, 0.0) / stratum[n]
+    return total, variance
+
+
+def ci95(variance):
+    """Half-width of the 95% confidence interval for a summed variance."""
+    return Z_95 * math.sqrt(variance)
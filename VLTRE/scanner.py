@@ -0,0 +1,823 @@
+# scanner.py
+
+import io
+import os
+import sys
+import json
+import time
+import heapq
+import socket
+from collections import deque
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from VLTRE import analyzers
+from VLTRE import archives
+from VLTRE import checkpoint
+from VLTRE import counting
+from VLTRE import filters
+from VLTRE import sampling
+from VLTRE import throttle
+
+# Version of the partial-result format written by --save-partial
+# (2 added the scan options and the host of every root)
+PARTIAL_VERSION = 2
+READABLE_PARTIAL_VERSIONS = (1, 2)
+
+IGNORE_PATTERNS = {
+    "__pycache__", ".git", "node_modules", "dist", "build",
+    "venv", "env", "env.bak", "site-packages"
+}
+
+# Directories of third-party code that --summarize-deps collapses into one node
+DEPENDENCY_NAMES = {"node_modules", "venv", ".venv", "site-packages", "dist"}
+
+# Files that mark a directory as the root of a project for --projects
+PROJECT_MARKERS = {"pyproject.toml", "setup.py", "package.json", "Cargo.toml", "go.mod"}
+# File statuses whose lines count towards totals
+COUNTED_STATUSES = ("counted", "estimated", "extrapolated")
+
+# Arguments that influence a scan result; everything else is presentation
+SCAN_OPTIONS = (
+    "ext", "max_file_bytes", "estimate_large", "share_entire_pot", "max_depth",
+    "top", "grep", "markers", "hash", "archives", "archive_depth", "size_only",
+    "summarize_deps", "where", "projects",
+)
+
+
+def new_result(top=10):
+    """Return an empty partial result."""
+    return {
+        "version": PARTIAL_VERSION,
+        "roots": [],
+        "hosts": [],
+        "options": None,
+        "tree": [],
+        "dirs": 0,
+        "files": 0,
+        "counted_files": 0,
+        "total_lines": 0,
+        "total_bytes": 0,
+        "by_ext": {},
+        "by_ext_bytes": {},
+        "size_only": False,
+        "skipped_binary": 0,
+        "skipped_large": 0,
+        "estimated_files": 0,
+        "unreadable_files": 0,
+        "errors": 0,
+        "archives": 0,
+        "archive_members": 0,
+        "dependency_dirs": 0,
+        "dependency_files": 0,
+        "dependency_bytes": 0,
+        "where": None,
+        "filtered_files": 0,
+        "pruned_dirs": 0,
+        "bytes_read": 0,
+        "elapsed": 0.0,
+        "pending_dirs": 0,
+        "truncated": [],
+        "analysis": {},
+        "top": top,
+        "largest": [],
+        "largest_bytes": [],
+        "projects": [],
+    }
+
+
+def scan_options(args):
+    """Return the scan-relevant arguments as a JSON-serialisable dict."""
+    return {key: getattr(args, key, None) for key in SCAN_OPTIONS}
+
+
+def option_conflicts(parts):
+    """
+    Return the scan options that differ between partial results, ignoring
+    --top (it only limits the lists kept). Partials that recorded no options
+    (format version 1) are not compared.
+    """
+    recorded = [part["options"] for part in parts if part.get("options") is not None]
+    keys = set().union(*recorded) if recorded else set()
+    return sorted(key for key in keys - {"top"}
+                  if len({json.dumps(options.get(key), sort_keys=True) for options in recorded}) > 1)
+
+
+def label_hosts(result):
+    """Prefix roots with their host when a merged result spans several hosts."""
+    hosts = result.get("hosts", [])
+    if len(set(host for host in hosts if host)) <= 1:
+        return
+    for i, host in enumerate(hosts):
+        if host:
+            result["roots"][i] = f"{host}:{result['roots'][i]}"
+            result["tree"][i]["name"] = f"{host}:{result['tree'][i]['name']}"
+
+
+def ignored(name, share_entire_pot=False):
+    """Return True if a directory entry should be left out of the scan."""
+    if name.startswith('.'):
+        return True
+    if share_entire_pot:
+        return False
+    return any(pat in name for pat in IGNORE_PATTERNS)
+
+
+def is_dependency(name):
+    """Return True if a directory name is one used for vendored or installed dependencies."""
+    return name in DEPENDENCY_NAMES
+
+
+def stat_walk(path, deadline=None):
+    """
+    Count the files and bytes below a directory using only directory listings
+    and lstat(); nothing is opened and symlinks are not followed.
+    Returns (files, size, complete).
+    """
+    files = size = 0
+    stack = [path]
+    while stack:
+        if deadline and time.monotonic() >= deadline:
+            return files, size, False
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            files += 1
+                            size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return files, size, True
+
+
+def _entry_sort_key(entry):
+    try:
+        is_file = not entry.is_dir()
+    except OSError:
+        is_file = True
+    return (is_file, entry.name.lower())
+
+
+def scan_root(root, args, deadline=None, cache=None, checkpoint_file=None):
+    """
+    Scan a single root breadth-first and return its partial result.
+    The partial result is a plain JSON-serialisable dict that can be merged
+    with others using merge_results(). When the time.monotonic() deadline
+    passes, the scan stops and unvisited directories are listed as truncated.
+
+    cache, if given, maps file paths to (size, mtime_ns, values, status) from
+    a previous scan; files whose size and mtime are unchanged are not reopened.
+    Archive listings and members are stored with the (size, mtime_ns) of the
+    archive file on disk, so an unchanged archive is not opened at all.
+    It is updated in place to hold exactly the files seen by this scan.
+
+    With --size-only no file is ever opened: sizes come from the stat() data
+    of the directory listing, archives are reported as plain files and
+    bytes are totalled per extension for every file, not just --ext.
+
+    checkpoint_file, if given, receives the walk frontier and the partial
+    aggregates every --checkpoint-interval seconds and when the walk ends;
+    with --resume the walk continues from it instead of starting over.
+    """
+    top = getattr(args, 'top', 10)
+    result = new_result(top)
+    result["options"] = scan_options(args)
+    exts = set(getattr(args, 'ext', []))
+    max_bytes = getattr(args, 'max_file_bytes', 0)
+    estimate = getattr(args, 'estimate_large', False)
+    share_entire_pot = getattr(args, 'share_entire_pot', False)
+    max_depth = getattr(args, 'max_depth', 0)
+    scan_archives = getattr(args, 'archives', False)
+    archive_depth = getattr(args, 'archive_depth', 2)
+    size_only = getattr(args, 'size_only', False)
+    result["size_only"] = size_only
+    summarize_deps = getattr(args, 'summarize_deps', False)
+    find_projects = getattr(args, 'projects', False)
+    # --where: decided from path and stat data where possible, from lines otherwise
+    where_text = getattr(args, 'where', None)
+    where = filters.parse(where_text) if where_text else None
+    result["where"] = where_text
+    # --io-limit/--files-per-sec: bucket installed by scan_roots(), shared by all workers
+    bucket = throttle.installed()
+    drop_cache = getattr(args, 'nice', False)
+    started = time.monotonic()
+    largest = []
+    pipeline = analyzers.build_analyzers(args)
+    extras = [a for a in pipeline if a.name != "lines"]
+    analysis = result["analysis"]
+    for analyzer in extras:
+        analysis[analyzer.name] = analyzer.empty_total()
+    # --estimate: open a random stratified sample and extrapolate the rest
+    fraction = None if size_only else getattr(args, 'estimate', None)
+    rng = sampling.make_rng(getattr(args, 'seed', None), root)
+    strata = {}
+    unsampled = []
+    fresh = {} if cache is not None else None
+
+    def rel_path(path):
+        """Path relative to the scanned root with '/' separators, as --where sees it."""
+        rel = path[len(root_prefix):] if path.startswith(root_prefix) else path
+        return rel.replace(os.sep, "/") if os.sep != "/" else rel
+
+    def analyze(path, size, opener, stamp):
+        """
+        Read and analyze one file, reusing the daemon cache when it is current.
+        stamp is the file's mtime_ns, or the (size, mtime_ns) of the archive
+        on disk for an archive member; None means the result is not cached.
+        """
+        hit = cache.get(path) if fresh is not None and stamp is not None else None
+        if hit and hit[0] == size and hit[1] == stamp:
+            values, status = hit[2], hit[3]
+            # Report the bytes an in-process scan reads, so both give the same result
+            result["bytes_read"] += counting.bytes_read(status, size)
+        else:
+            values, status = counting.analyze_file(path, pipeline, max_bytes=max_bytes,
+                                                   estimate=estimate, size=size, opener=opener,
+                                                   drop_cache=drop_cache, bucket=bucket)
+            result["bytes_read"] += counting.bytes_read(status, size)
+        if fresh is not None and stamp is not None:
+            fresh[path] = (size, stamp, values, status)
+        return values, status
+
+    def add_file(node, name, path, size, opener=None, mtime=None, depth=1, stamp=None):
+        """Add a file node and analyze it if its extension is counted (stamp: see analyze())."""
+        if bucket is not None:
+            bucket.acquire(0, 1)
+        ext = os.path.splitext(name)[1].lower()
+        analyzed = None
+        if where is not None:
+            facts = {"path": rel_path(path), "name": name, "ext": ext, "size": size,
+                     "mtime": mtime / 1e9 if mtime is not None else None, "depth": depth}
+            keep = filters.matches_file(where, facts)
+            if keep is None and (size_only or ext not in exts):
+                facts["lines"] = None  # never read, so no lines test can match
+                keep = filters.matches_file(where, facts)
+            if keep is None:
+                # Only the line count can decide: read the file now and keep the values
+                analyzed = analyze(path, size, opener, stamp)
+                counted = analyzed[1] in ("counted", "estimated")
+                facts["lines"] = analyzed[0].get("lines", 0) if counted else None
+                keep = filters.matches_file(where, facts)
+            if not keep:
+                result["filtered_files"] += 1
+                return
+        result["files"] += 1
+        result["total_bytes"] += size
+        if size_only:
+            node["children"].append({"name": name, "type": "file", "size": size})
+            by_ext_bytes = result["by_ext_bytes"]
+            by_ext_bytes[ext] = by_ext_bytes.get(ext, 0) + size
+            item = (size, path)
+            if len(largest) < top:
+                heapq.heappush(largest, item)
+            elif item > largest[0]:
+                heapq.heapreplace(largest, item)
+            return
+        child = {"name": name, "type": "file", "lines": 0, "size": size}
+        node["children"].append(child)
+        if ext not in exts:
+            return
+        stratum = None
+        if fraction:
+            key = sampling.stratum_key(ext, size)
+            stratum = strata.get(key)
+            if stratum is None:
+                stratum = strata[key] = sampling.new_stratum()
+            sampling.add_file(stratum, size)
+            if analyzed is None and not sampling.should_sample(stratum, fraction, rng):
+                child["status"] = "extrapolated"
+                unsampled.append((child, key, ext, path))
+                return
+        values, status = analyzed or analyze(path, size, opener, stamp)
+        lines = values.get("lines", 0)
+        if stratum is not None:
+            sampling.add_sample(stratum, size, lines if status in ("counted", "estimated") else 0)
+        child["lines"] = lines
+        child["status"] = status
+        for analyzer in extras:
+            if analyzer.name in values:
+                value = values[analyzer.name]
+                if value:
+                    child[analyzer.name] = value
+                analyzer.add(analysis[analyzer.name], value)
+        if status == "binary":
+            result["skipped_binary"] += 1
+        elif status == "too_large":
+            result["skipped_large"] += 1
+        elif status == "estimated":
+            result["estimated_files"] += 1
+        elif status == "error":
+            # Counted in errors too, so the scan reports itself as incomplete
+            print(f"[ERROR] Cannot read file: {path}", file=sys.stderr)
+            result["unreadable_files"] += 1
+            result["errors"] += 1
+        if status not in ("counted", "estimated"):
+            return
+        result["total_lines"] += lines
+        result["counted_files"] += 1
+        result["by_ext"][ext] = result["by_ext"].get(ext, 0) + lines
+        item = (lines, path, status == "estimated")
+        if len(largest) < top:
+            heapq.heappush(largest, item)
+        elif item > largest[0]:
+            heapq.heapreplace(largest, item)
+
+    def expand_archive(node, path, source, level, depth, stamp=None):
+        """
+        Add the members of an archive under its virtual directory node,
+        streaming member bytes without extracting to disk. stamp is the
+        (size, mtime_ns) of the archive file on disk; while it is unchanged,
+        the cached listing and member results are used without opening it.
+        """
+        result["archives"] += 1
+        errors = result["errors"]
+        listing_key = path + archives.MEMBER_SEP
+        hit = cache.get(listing_key) if fresh is not None and stamp is not None else None
+        if hit and hit[1] == stamp:
+            members = [(member, size, None) for member, size in hit[2]]
+        else:
+            members = archives.iter_members(source, node["name"])
+        listed = []
+        dirs = {(): node}
+        try:
+            for member, size, opener in members:
+                listed.append((member, size))
+                parts = tuple(part for part in member.split("/") if part and part != ".")
+                if not parts or any(ignored(part, share_entire_pot) for part in parts):
+                    continue
+                parent = dirs.get(parts[:-1])
+                if parent is None:
+                    parent = node
+                    for i in range(len(parts) - 1):
+                        sub = dirs.get(parts[:i + 1])
+                        if sub is None:
+                            sub = dirs[parts[:i + 1]] = {"name": parts[i], "type": "dir", "children": []}
+                            parent["children"].append(sub)
+                            result["dirs"] += 1
+                        parent = sub
+                name = parts[-1]
+                member_path = f"{path}{archives.MEMBER_SEP}{'/'.join(parts)}"
+                result["archive_members"] += 1
+                if (level < archive_depth and archives.is_archive(name)
+                        and not (max_bytes and size > max_bytes)):
+                    nested = None
+                    if opener is not None:
+                        with opener() as f:
+                            nested = io.BytesIO(counting.read_bytes(f, size, bucket))
+                    # Counted on a cached listing too, so the daemon reports what a scan reads
+                    result["bytes_read"] += size
+                    child = {"name": name, "type": "dir", "archive": True, "children": []}
+                    parent["children"].append(child)
+                    result["dirs"] += 1
+                    expand_archive(child, member_path, nested, level + 1, depth + len(parts), stamp)
+                    continue
+                add_file(parent, name, member_path, size, opener, depth=depth + len(parts), stamp=stamp)
+        except Exception as e:
+            print(f"[ERROR] Cannot read archive {path}: {e}", file=sys.stderr)
+            result["errors"] += 1
+        # Only a listing read without errors (nested archives included) is reused
+        if fresh is not None and stamp is not None and result["errors"] == errors:
+            fresh[listing_key] = (None, stamp, listed, None)
+        for sub in dirs.values():
+            sub["children"].sort(key=lambda c: (c["type"] == "file", c["name"].lower()))
+
+    def visit(folder, node, depth, start=0):
+        """
+        List one directory, analyze its files and queue its subdirectories.
+        Returns None when done, or the index of the first unprocessed entry
+        when the deadline passes, so that the directory can be continued.
+        """
+        try:
+            if not os.path.exists(folder):
+                print(f"[ERROR] Path does not exist: {folder}", file=sys.stderr)
+                result["errors"] += 1
+                return None
+            if not os.access(folder, os.R_OK):
+                print(f"[ERROR] Cannot read directory: {folder}", file=sys.stderr)
+                result["errors"] += 1
+                return None
+            with os.scandir(folder) as it:
+                entries = sorted(it, key=_entry_sort_key)
+            if not start:
+                result["dirs"] += 1
+            for index in range(start, len(entries)):
+                # At least one entry per call, so a directory counted above is
+                # never queued again with start 0 and counted twice
+                if index > start and deadline and time.monotonic() >= deadline:
+                    return index
+                entry = entries[index]
+                if find_projects and entry.name in PROJECT_MARKERS:
+                    node["project"] = True
+                path = os.path.join(folder, entry.name)
+                if (where is not None and entry.is_dir()
+                        and filters.matches_dir(where, rel_path(path), depth + 1) is False):
+                    # No file below can match: do not list the directory at all
+                    result["pruned_dirs"] += 1
+                    continue
+                if summarize_deps and is_dependency(entry.name) and entry.is_dir():
+                    # One collapsed node with stat-only totals instead of a subtree
+                    files, size, complete = stat_walk(path, deadline)
+                    child = {"name": entry.name, "type": "dir", "dependency": True, "children": [],
+                             "files": files, "size": size, "lines": 0}
+                    if not complete:
+                        child["truncated"] = True
+                    node["children"].append(child)
+                    result["dependency_dirs"] += 1
+                    result["dependency_files"] += files
+                    result["dependency_bytes"] += size
+                    continue
+                if ignored(entry.name, share_entire_pot):
+                    continue
+                if entry.is_dir():
+                    child = {"name": entry.name, "type": "dir", "children": []}
+                    node["children"].append(child)
+                    if not (max_depth > 0 and depth + 1 >= max_depth):
+                        queue.append((path, child, depth + 1, 0))
+                    continue
+                try:
+                    st = entry.stat()
+                    size, mtime = st.st_size, st.st_mtime_ns
+                except OSError:
+                    size, mtime = 0, None
+                if (scan_archives and not size_only and archives.is_archive(entry.name)
+                        and not (max_depth > 0 and depth + 1 >= max_depth)):
+                    child = {"name": entry.name, "type": "dir", "archive": True, "children": []}
+                    node["children"].append(child)
+                    result["dirs"] += 1
+                    expand_archive(child, path, path, 1, depth + 1,
+                                   (size, mtime) if mtime is not None else None)
+                    continue
+                add_file(node, entry.name, path, size, mtime=mtime, depth=depth + 1, stamp=mtime)
+        except Exception as e:
+            print(f"[ERROR] Error during directory walk {folder}: {e}", file=sys.stderr)
+            result["errors"] += 1
+        return None
+
+    root = str(root)
+    root_prefix = root if root.endswith(os.sep) else root + os.sep
+    root_node = {"name": str(Path(root).resolve()), "type": "dir", "children": []}
+    queue = deque([(root, root_node, 0, 0)])
+
+    interval = getattr(args, 'checkpoint_interval', checkpoint.DEFAULT_INTERVAL)
+    options = dict(scan_options(args), estimate=fraction, seed=getattr(args, 'seed', None))
+    if checkpoint_file and getattr(args, 'resume', False):
+        try:
+            state = checkpoint.load(checkpoint_file, root, options)
+        except Exception as e:
+            print(f"[ERROR] Cannot resume from {checkpoint_file}: {e}", file=sys.stderr)
+            state = None
+        if state is not None:
+            result.update(state["result"])
+            analysis = result["analysis"]
+            root_node = state["tree"]
+            queue = deque(state["queue"])
+            largest = state["largest"]
+            strata = state["strata"]
+            unsampled = state["unsampled"]
+            rng.setstate(state["rng"])
+
+    def save_checkpoint():
+        try:
+            checkpoint.save(checkpoint_file, root, options, result, root_node, queue,
+                            largest, strata, unsampled, rng)
+        except Exception as e:
+            print(f"[ERROR] Writing checkpoint {checkpoint_file} failed: {e}", file=sys.stderr)
+
+    # Breadth-first, so shallow structure is complete before any deep detail
+    # when the time budget runs out. Checkpoints are only taken between
+    # directories, where the tree, counters and queue agree with each other.
+    next_checkpoint = time.monotonic() + interval
+    while queue:
+        if deadline and time.monotonic() >= deadline:
+            break
+        if checkpoint_file and time.monotonic() >= next_checkpoint:
+            save_checkpoint()
+            next_checkpoint = time.monotonic() + interval
+        folder, node, depth, start = queue.popleft()
+        stopped_at = visit(folder, node, depth, start)
+        if stopped_at is not None:
+            queue.appendleft((folder, node, depth, stopped_at))
+            break
+    if checkpoint_file:
+        save_checkpoint()
+    for folder, node, _, _ in queue:
+        node["truncated"] = True
+        result["truncated"].append(folder)
+    result["pending_dirs"] = len(queue)
+    if fresh is not None:
+        cache.clear()
+        cache.update(fresh)
+
+    result["elapsed"] = time.monotonic() - started
+    if where is not None:
+        drop_empty_dirs(root_node)
+    if fraction:
+        extrapolate(result, strata, unsampled, largest, top)
+        result["estimate"]["fraction"] = fraction
+        result["estimate"]["seed"] = getattr(args, 'seed', None)
+    aggregate(root_node)
+    if find_projects:
+        result["projects"] = project_totals(root_node, top)
+    result["roots"].append(root_node["name"])
+    result["hosts"].append(socket.gethostname())
+    result["tree"].append(root_node)
+    largest = [list(item) for item in sorted(largest, reverse=True)]
+    if size_only:
+        result["largest_bytes"] = largest
+    else:
+        result["largest"] = largest
+    return result
+
+
+def extrapolate(result, strata, unsampled, largest, top):
+    """
+    Fill in line counts for files that were stat()ed but not opened, using
+    each stratum's sampled lines-per-byte ratio, and record the variance
+    of the estimated totals.
+    """
+    estimate = result["estimate"] = {
+        "sampled_files": sum(s[sampling.n] for s in strata.values()),
+        "extrapolated_files": len(unsampled),
+        "variance": 0.0,
+        "by_ext_variance": {},
+    }
+    ratios = {key: sampling.ratio(stratum) for key, stratum in strata.items()}
+    for node, key, ext, path in unsampled:
+        lines = int(round(ratios[key] * node["size"]))
+        node["lines"] = lines
+        result["total_lines"] += lines
+        result["by_ext"][ext] = result["by_ext"].get(ext, 0) + lines
+        item = (lines, path, True)
+        if len(largest) < top:
+            heapq.heappush(largest, item)
+        elif item > largest[0]:
+            heapq.heapreplace(largest, item)
+    for key, stratum in strata.items():
+        ext = key.rsplit("|", 1)[0]
+        _, variance = sampling.estimate(stratum)
+        estimate["variance"] += variance
+        estimate["by_ext_variance"][ext] = estimate["by_ext_variance"].get(ext, 0.0) + variance
+
+
+def drop_empty_dirs(root_node):
+    """
+    Remove directories left without entries because --where filtered out
+    everything below them. Collapsed, archive and truncated nodes are kept.
+    """
+    order = []
+    stack = [root_node]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(child for child in node["children"] if child["type"] == "dir")
+    for node in reversed(order):
+        node["children"] = [
+            child for child in node["children"]
+            if child["type"] != "dir" or child["children"]
+            or child.get("dependency") or child.get("archive") or child.get("truncated")
+        ]
+
+
+def aggregate(root_node):
+    """
+    Compute size, file count and lines for every directory node in one
+    post-order pass over the tree built by the walk. Dependency nodes keep
+    their own stat-only totals but, like the result totals, their parents
+    leave them out.
+    """
+    order = []
+    stack = [root_node]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(child for child in node["children"] if child["type"] == "dir")
+    # Reversed pre-order visits every child before its parent
+    for node in reversed(order):
+        if node.get("dependency"):
+            continue  # totals come from the stat-only walk
+        size = files = lines = 0
+        for child in node["children"]:
+            if child.get("dependency"):
+                continue
+            size += child.get("size", 0)
+            lines += child.get("lines", 0)
+            files += child.get("files", 0) if child["type"] == "dir" else 1
+        node["size"] = size
+        node["files"] = files
+        node["lines"] = lines
+
+
+def project_totals(root_node, top=10):
+    """
+    Assign every file to its nearest enclosing project (a directory holding
+    one of PROJECT_MARKERS) and return per-project totals, heaviest first.
+    Files outside every project are grouped under the path None.
+    """
+    projects = {}
+    root_project = root_node["name"] if root_node.get("project") else None
+    stack = [(root_node, root_node["name"], root_project)]
+    while stack:
+        node, path, project = stack.pop()
+        for child in node["children"]:
+            child_path = os.path.join(path, child["name"])
+            if child["type"] == "dir":
+                if not child.get("dependency"):
+                    stack.append((child, child_path, child_path if child.get("project") else project))
+                continue
+            totals = projects.get(project)
+            if totals is None:
+                totals = projects[project] = {"path": project, "files": 0, "lines": 0, "size": 0,
+                                              "by_ext": {}, "largest": []}
+            totals["files"] += 1
+            totals["size"] += child.get("size", 0)
+            if child.get("status") not in COUNTED_STATUSES:
+                continue
+            lines = child["lines"]
+            totals["lines"] += lines
+            ext = os.path.splitext(child["name"])[1].lower()
+            totals["by_ext"][ext] = totals["by_ext"].get(ext, 0) + lines
+            largest = totals["largest"]
+            item = (lines, child_path)
+            if len(largest) < top:
+                heapq.heappush(largest, item)
+            elif item > largest[0]:
+                heapq.heapreplace(largest, item)
+    for totals in projects.values():
+        totals["largest"] = [list(item) for item in sorted(totals["largest"], reverse=True)]
+    return sorted(projects.values(), key=lambda p: (-p["lines"], p["path"] or ""))
+
+
+SORT_KEYS = {
+    "lines": lambda node: (-node.get("lines", 0), node["name"].lower()),
+    "size": lambda node: (-node.get("size", 0), node["name"].lower()),
+}
+
+
+def sort_tree(tree, sort_by="name"):
+    """Re-order children in place by subtree lines or size (name keeps walk order)."""
+    key = SORT_KEYS.get(sort_by)
+    if key is None:
+        return
+    stack = list(tree)
+    while stack:
+        node = stack.pop()
+        node["children"].sort(key=key)
+        stack.extend(child for child in node["children"] if child["type"] == "dir")
+
+
+def top_dirs(tree, count, metric="lines"):
+    """Return the `count` heaviest directories as (value, path, node) tuples."""
+    heap = []
+    stack = [(node, node["name"]) for node in tree]
+    while stack:
+        node, path = stack.pop()
+        for child in node["children"]:
+            if child["type"] != "dir":
+                continue
+            child_path = os.path.join(path, child["name"])
+            item = (child.get(metric, 0), child_path)
+            if len(heap) < count:
+                heapq.heappush(heap, (item, child))
+            elif item > heap[0][0]:
+                heapq.heapreplace(heap, (item, child))
+            stack.append((child, child_path))
+    return [(value, path, node) for (value, path), node in sorted(heap, key=lambda x: x[0], reverse=True)]
+
+
+def file_findings(tree, key, count):
+    """
+    Return the `count` files with the largest value of a per-file analyzer
+    key (e.g. "grep") as (value, path) tuples.
+    """
+    heap = []
+    stack = [(node, node["name"]) for node in tree]
+    while stack:
+        node, path = stack.pop()
+        for child in node["children"]:
+            child_path = os.path.join(path, child["name"])
+            if child["type"] == "dir":
+                stack.append((child, child_path))
+            elif child.get(key):
+                item = (child[key], child_path)
+                if len(heap) < count:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+    return sorted(heap, reverse=True)
+
+
+def duplicate_groups(tree):
+    """Return lists of paths whose content hashes are identical."""
+    by_hash = {}
+    stack = [(node, node["name"]) for node in tree]
+    while stack:
+        node, path = stack.pop()
+        for child in node["children"]:
+            child_path = os.path.join(path, child["name"])
+            if child["type"] == "dir":
+                stack.append((child, child_path))
+            elif child.get("hash"):
+                by_hash.setdefault(child["hash"], []).append(child_path)
+    return [sorted(paths) for paths in by_hash.values() if len(paths) > 1]
+
+
+def merge_results(parts, top=None):
+    """Combine several partial results into one."""
+    if top is None:
+        top = max((p.get("top", 10) for p in parts), default=10)
+    merged = new_result(top)
+    largest = []
+    largest_bytes = []
+    for part in parts:
+        merged["roots"].extend(part.get("roots", []))
+        merged["hosts"].extend(part.get("hosts") or [None] * len(part.get("roots", [])))
+        if merged["options"] is None:
+            merged["options"] = part.get("options")
+        merged["tree"].extend(part.get("tree", []))
+        for key in ("dirs", "files", "counted_files", "total_lines", "total_bytes",
+                    "skipped_binary", "skipped_large", "estimated_files", "unreadable_files", "errors", "pending_dirs",
+                    "archives", "archive_members", "dependency_dirs", "dependency_files",
+                    "dependency_bytes", "filtered_files", "pruned_dirs", "bytes_read"):
+            merged[key] += part.get(key, 0)
+        # Roots are scanned side by side, so the slowest one sets the duration
+        merged["elapsed"] = max(merged["elapsed"], part.get("elapsed", 0.0))
+        merged["truncated"].extend(part.get("truncated", []))
+        merged["projects"].extend(part.get("projects", []))
+        for ext, lines in part.get("by_ext", {}).items():
+            merged["by_ext"][ext] = merged["by_ext"].get(ext, 0) + lines
+        for ext, size in part.get("by_ext_bytes", {}).items():
+            merged["by_ext_bytes"][ext] = merged["by_ext_bytes"].get(ext, 0) + size
+        merged["size_only"] = merged["size_only"] or part.get("size_only", False)
+        merged["where"] = merged["where"] or part.get("where")
+        merged["analysis"] = analyzers.merge_totals(merged["analysis"], part.get("analysis", {}))
+        if "estimate" in part:
+            merged["estimate"] = merge_estimates(merged.get("estimate"), part["estimate"])
+        largest.extend(tuple(item) for item in part.get("largest", []))
+        largest_bytes.extend(tuple(item) for item in part.get("largest_bytes", []))
+    merged["largest"] = [list(item) for item in heapq.nlargest(top, largest)]
+    merged["largest_bytes"] = [list(item) for item in heapq.nlargest(top, largest_bytes)]
+    return merged
+
+
+def merge_estimates(total, other):
+    """Combine the sampling summaries of two estimated partial results."""
+    if total is None:
+        return dict(other, by_ext_variance=dict(other.get("by_ext_variance", {})))
+    for key in ("sampled_files", "extrapolated_files", "variance"):
+        total[key] += other.get(key, 0)
+    for ext, variance in other.get("by_ext_variance", {}).items():
+        total["by_ext_variance"][ext] = total["by_ext_variance"].get(ext, 0.0) + variance
+    return total
+
+
+def scan_roots(roots, args, jobs=0):
+    """
+    Scan several roots and merge their partial results.
+    Each root is scanned by its own worker process when there is more than one
+    root and jobs is not 1; jobs=0 uses one worker per CPU. With --checkpoint
+    and several roots, each root checkpoints to FILE.<index>. --io-limit and
+    --files-per-sec are enforced by one token bucket for all workers.
+    """
+    started = time.monotonic()
+    roots = [str(r) for r in roots]
+    budget = getattr(args, 'time_budget', 0)
+    deadline = time.monotonic() + budget if budget else None
+    path = getattr(args, 'checkpoint', '')
+    checkpoints = [checkpoint.checkpoint_path(path, i, len(roots)) if path else None
+                   for i in range(len(roots))]
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(roots))
+    bucket = throttle.new_bucket(getattr(args, 'io_limit', 0) * 1024 * 1024,
+                                 getattr(args, 'files_per_sec', 0), shared=jobs > 1)
+    if jobs <= 1:
+        throttle.install(bucket)
+        try:
+            parts = [scan_root(root, args, deadline, checkpoint_file=cp) for root, cp in zip(roots, checkpoints)]
+        finally:
+            throttle.install(None)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=throttle.install, initargs=(bucket,)) as pool:
+            parts = list(pool.map(scan_root, roots, [args] * len(roots), [deadline] * len(roots),
+                                  [None] * len(roots), checkpoints))
+    merged = merge_results(parts, getattr(args, 'top', 10))
+    merged["elapsed"] = time.monotonic() - started
+    return merged
+
+
+def save_partial(result, path):
+    """Write a partial result to disk for a later `pot merge`."""
+    Path(path).write_text(json.dumps(result), encoding='utf-8')
+
+
+def load_partial(path):
+    """Read a partial result written by save_partial()."""
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+    if data.get("version") not in READABLE_PARTIAL_VERSIONS:
+        raise ValueError(f"unsupported partial result version in {path}: {data.get('version')}")
+    return data
@@ -0,0 +1,210 @@
+# state_store.py
+
+import os
+import sys
+import json
+import time
+import atexit
+import tempfile
+
+# Folded progress counters (same format as before, plus the journals folded into it)
+DATA_FILE = os.path.expanduser("~/.pot_progress.json")
+# One small file per run holding that run's increments
+JOURNAL_DIR = DATA_FILE[:-len(".json")] + ".d"
+# Number of journal files that makes a writer fold them into DATA_FILE; with 1
+# every run folds its own journal, so readers normally open DATA_FILE alone
+COMPACT_AFTER = 1
+# Seconds after which a compaction marker is considered left over from a crash
+STALE_MARKER = 60.0
+# Number of growth stages, and runs it takes to grow one stage
+STAGES = 5
+RUNS_PER_STAGE = 10
+
+# Only total_runs is stored; growth_stage and regrow_count are derived from it
+# on read, so concurrent runs can never advance the stage twice
+DEFAULTS = {"total_runs": 0}
+DERIVED = ("growth_stage", "regrow_count")
+
+_MARKER = "compact.lock"
+_pending = {}
+_registered = False
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_atomic(path, data):
+    """Write JSON to a temporary file in the same directory and rename it into place."""
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def derive(total_runs):
+    """Return the progress values that follow from a number of runs."""
+    regrow_count = total_runs // RUNS_PER_STAGE
+    return {"total_runs": total_runs, "growth_stage": regrow_count % STAGES,
+            "regrow_count": regrow_count}
+
+
+def _journals():
+    try:
+        return [name for name in os.listdir(JOURNAL_DIR) if name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+
+
+def _load_base():
+    try:
+        base = _read_json(DATA_FILE)
+    except FileNotFoundError:
+        return dict(DEFAULTS, folded=[])
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Ignoring unreadable progress file {DATA_FILE}: {e}", file=sys.stderr)
+        return dict(DEFAULTS, folded=[])
+    data = dict(DEFAULTS, folded=[])
+    if isinstance(base, dict):
+        data.update(base)
+    # Files written before the stage was derived also stored growth_stage and regrow_count
+    for key in DERIVED:
+        data.pop(key, None)
+    return data
+
+
+def _add_counts(data, deltas):
+    for key, value in deltas.items():
+        if key not in DERIVED:
+            data[key] = data.get(key, 0) + value
+
+
+def load():
+    """
+    Return the progress counters: the folded base plus every journal not yet
+    folded into it, including increments of this process not yet written,
+    with growth_stage and regrow_count derived from total_runs.
+    """
+    names = _journals()
+    data = _load_base()
+    folded = set(data.pop("folded"))
+    for name in names:
+        if name in folded:
+            continue
+        try:
+            deltas = _read_json(os.path.join(JOURNAL_DIR, name))
+        except (OSError, ValueError):
+            continue  # folded and removed since it was listed, or not ours
+        _add_counts(data, deltas)
+    _add_counts(data, _pending)
+    data.update(derive(data["total_runs"]))
+    return data
+
+
+def add(deltas, defer=False):
+    """
+    Record increments to the progress counters. Each call is written as a new
+    journal file, so concurrent runs never overwrite each other's counts.
+    With defer, the increments are kept in memory and written once at exit.
+    """
+    global _registered
+    for key, value in deltas.items():
+        _pending[key] = _pending.get(key, 0) + value
+    if not defer:
+        flush()
+    elif not _registered:
+        atexit.register(flush)
+        _registered = True
+
+
+def save(data):
+    """
+    Store absolute values by recording their difference from the current
+    counters. Derived values are not stored; change total_runs instead.
+    """
+    current = load()
+    deltas = {key: value - current.get(key, 0) for key, value in data.items()
+              if key not in DERIVED and isinstance(value, int) and value != current.get(key, 0)}
+    if deltas:
+        add(deltas)
+
+
+def flush():
+    """Write pending increments as one journal file and fold journals into DATA_FILE."""
+    if not _pending:
+        return
+    deltas = dict(_pending)
+    _pending.clear()
+    try:
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        name = f"{time.time_ns()}-{os.getpid()}-{os.urandom(4).hex()}.json"
+        _write_atomic(os.path.join(JOURNAL_DIR, name), deltas)
+        if len(_journals()) >= COMPACT_AFTER:
+            compact()
+    except OSError as e:
+        print(f"[ERROR] Saving progress to {JOURNAL_DIR} failed: {e}", file=sys.stderr)
+
+
+def _claim_marker(marker):
+    try:
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    try:
+        if time.time() - os.path.getmtime(marker) < STALE_MARKER:
+            return False
+        os.unlink(marker)
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except OSError:
+        return False
+
+
+def compact():
+    """
+    Fold journal files into DATA_FILE. Only the process that creates the
+    marker file compacts; others skip it instead of waiting. The new base
+    lists the journals it folded, so readers never count them twice and a
+    crash before they are deleted loses nothing.
+    """
+    marker = os.path.join(JOURNAL_DIR, _MARKER)
+    if not _claim_marker(marker):
+        return
+    try:
+        names = _journals()
+        base = _load_base()
+        already = set(base.pop("folded"))
+        folded = []
+        for name in names:
+            if name in already:
+                continue
+            try:
+                deltas = _read_json(os.path.join(JOURNAL_DIR, name))
+            except (OSError, ValueError):
+                continue
+            _add_counts(base, deltas)
+            folded.append(name)
+        # Keep listing leftovers of an interrupted compaction until they are gone
+        base["folded"] = folded + [name for name in names if name in already]
+        _write_atomic(DATA_FILE, base)
+        for name in base["folded"]:
+            try:
+                os.unlink(os.path.join(JOURNAL_DIR, name))
+            except OSError:
+                pass
+    finally:
+        try:
+            os.unlink(marker)
+        except OSError:
+            pass
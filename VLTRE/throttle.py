@@ -0,0 +1,103 @@
+# throttle.py
+
+import os
+import time
+import threading
+import multiprocessing
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Amount added to the CPU nice value by --nice
+NICE_INCREMENT = 10
+
+# Bucket used by scan_root() in this process (installed by scan_roots())
+_installed = None
+
+
+class TokenBucket:
+    """
+    Rate limiter over several quantities at once (bytes read, files visited).
+    Each quantity refills at its rate and holds at most one second's worth;
+    callers take what they used and sleep off any debt, so the long-run rate
+    never exceeds the limit. With shared=True the state lives in shared memory
+    and one budget is enforced across all worker processes.
+    """
+
+    def __init__(self, rates, shared=False):
+        self.rates = tuple(rates)
+        # Start empty, so that even a short scan stays within the limit
+        initial = [0.0] * len(self.rates) + [time.monotonic()]
+        if shared:
+            self.state = multiprocessing.Array("d", initial)
+            self.lock = self.state.get_lock()
+        else:
+            self.state = initial
+            self.lock = threading.Lock()
+
+    def acquire(self, *amounts):
+        """Take the given amount of each quantity, sleeping if over budget."""
+        wait = 0.0
+        with self.lock:
+            state = self.state
+            now = time.monotonic()
+            elapsed = now - state[-1]
+            state[-1] = now
+            for i, rate in enumerate(self.rates):
+                if not rate:
+                    continue
+                tokens = min(state[i] + elapsed * rate, rate) - amounts[i]
+                state[i] = tokens
+                if tokens < 0:
+                    wait = max(wait, -tokens / rate)
+        if wait:
+            time.sleep(wait)
+
+
+def new_bucket(bytes_per_sec=0, files_per_sec=0, shared=False):
+    """Return a bucket for the given limits, or None when neither is set."""
+    if not bytes_per_sec and not files_per_sec:
+        return None
+    return TokenBucket((bytes_per_sec, files_per_sec), shared)
+
+
+def install(bucket):
+    """Make a bucket the one used by scans in this process (also a pool initializer)."""
+    global _installed
+    _installed = bucket
+
+
+def installed():
+    return _installed
+
+
+def lower_priority():
+    """
+    Lower the CPU priority of this process and, where psutil supports it,
+    its I/O priority (idle class on Linux, very low on Windows). Worker
+    processes started afterwards inherit both. Returns a list describing
+    what was applied.
+    """
+    applied = []
+    if hasattr(os, "nice"):
+        try:
+            os.nice(NICE_INCREMENT)
+            applied.append(f"nice +{NICE_INCREMENT}")
+        except OSError:
+            pass
+    # Without psutil (or without ionice support, e.g. on macOS) only the CPU priority changes
+    if hasattr(psutil, "IOPRIO_CLASS_IDLE"):
+        io_class, label = psutil.IOPRIO_CLASS_IDLE, "idle I/O class"
+    elif hasattr(psutil, "IOPRIO_VERYLOW"):
+        io_class, label = psutil.IOPRIO_VERYLOW, "very low I/O priority"
+    else:
+        io_class = None
+    if io_class is not None:
+        try:
+            psutil.Process().ionice(io_class)
+            applied.append(label)
+        except (psutil.Error, OSError, AttributeError):
+            pass
+    return applied
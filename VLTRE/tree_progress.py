@@ -1,34 +1,19 @@
 import os
-import json
 from VLTRE import display
+from VLTRE import state_store
 
 # Path for user data
-DATA_FILE = os.path.expanduser("~/.pot_progress.json")
+DATA_FILE = state_store.DATA_FILE
 # Path for ASCII art files
 STAGE_DIR = 'stages'  # Make sure this directory exists and contains stage0.txt, stage1.txt, etc.
 
 def load_user_data():
-    """Load user progress or return defaults."""
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    # Defaults: start at stage 0, zero regrow count, zero total runs
-    return {
-        "growth_stage": 0,
-        "regrow_count": 0,
-        "total_runs": 0
-    }
+    """Load user progress (stage 0, zero regrow count, zero total runs by default)."""
+    return state_store.load()
 
 def save_user_data(data):
-    """Save user progress."""
-    try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f)
-    except:
-        pass
+    """Save user progress as increments, so concurrent runs do not overwrite each other."""
+    state_store.save(data)
 
 def get_tree_lines(stage):
     """Load ASCII art for the current stage from a text file."""
@@ -49,21 +34,9 @@ def show_progress_bar(progress, indent=''):
     
     # Check if progress is complete
     if progress >= 100:
-        # Load user data
+        # The stage is derived from total_runs, so there is nothing to store
         data = load_user_data()
 
-        # Reset total_runs
-        data['total_runs'] = 0
-
-        # Advance stage: cycle from 0 to 4
-        if data['growth_stage'] < 4:
-            data['growth_stage'] += 1
-        else:
-            data['growth_stage'] = 0
-
-        # Save updated data
-        save_user_data(data)
-
         print(f"\n--- Progress complete! Moving to stage {data['growth_stage']} ---\n")
 
 def display_banner_with_tree():
@@ -71,7 +44,7 @@ def display_banner_with_tree():
     data = load_user_data()
     current_stage = data['growth_stage']
     total_runs = data['total_runs']
-    progress = (total_runs % 10) / 10
+    progress = (total_runs % state_store.RUNS_PER_STAGE) / state_store.RUNS_PER_STAGE
     indent = ' ' * 20
 
     # Show current stage explicitly for debugging
@@ -81,7 +54,4 @@ def display_banner_with_tree():
     display.display_banner_and_tree(current_stage, indent=indent)
 
     # Show progress bar
-    show_progress_bar(progress, indent=indent)
-
-    # Save current state in case progress changed
-    save_user_data(data)
\ No newline at end of file
+    show_progress_bar(progress, indent=indent)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Benchmark the tree renderer against the original per-entry formatting.
+
+Usage:
+    python benchmarks/bench_render.py [LINES]   (default: 2,000,000 tree lines)
+"""
+
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from VLTRE import display, render
+
+
+def build_tree(total, fanout=20, files_per_dir=30, max_depth=6):
+    """Build a synthetic scanner tree with roughly `total` entries."""
+    count = 0
+    root = {"name": "/bench", "type": "dir", "children": []}
+    queue = deque([(root, 0)])
+    while queue and count < total:
+        node, depth = queue.popleft()
+        for i in range(files_per_dir):
+            node["children"].append({"name": f"module_{i}.py", "type": "file",
+                                     "lines": (i * 37) % 900, "status": "counted"})
+            count += 1
+        if depth < max_depth:
+            for i in range(fanout):
+                child = {"name": f"package_{i}", "type": "dir", "children": []}
+                node["children"].append(child)
+                queue.append((child, depth + 1))
+                count += 1
+    return [root]
+
+
+def legacy_render(nodes, cli_mode=True, big_file=300, depth=0, out=None):
+    """The original walk() formatting: prefix rebuilt and colour() called per entry."""
+    if out is None:
+        out = []
+    for node in nodes:
+        indent = "│   " * depth + "├── "
+        if node["type"] == "dir":
+            display.colour("dir", node["name"], cli_mode)
+            out.append(f"{indent}{display.colour('dir', node['name'], cli_mode)}/")
+            legacy_render(node["children"], cli_mode, big_file, depth + 1, out)
+            continue
+        lines = node.get("lines", 0)
+        role = "big" if lines >= big_file else "file"
+        display_name = display.colour(role, node["name"], cli_mode)
+        out.append(f"{indent}{display_name:35} {lines:>7}" if lines else f"{indent}{display_name}")
+    return out
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.2f}s")
+    return elapsed
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    tree = build_tree(total)
+    print(f"Rendering ~{total:,} tree lines")
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        legacy = timed("legacy (rebuilt prefixes, list + join)",
+                       lambda: sink.write("\n".join(legacy_render(tree[0]["children"]))))
+        fast = timed("render.write_tree (colour)",
+                     lambda: render.write_tree(sink, tree))
+        timed("render.write_tree (no colour)",
+              lambda: render.write_tree(sink, tree, cli_mode=False))
+    print(f"speed-up: {legacy / fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import hashlib
+import argparse
+
+from VLTRE import analyzers, counting
+
+DATA = b"# TODO: split\nimport os\n\ndef main():  # FIXME later\n    return os.sep  # TODO\n"
+
+
+def test_build_analyzers_puts_lines_first():
+    args = argparse.Namespace(grep="os", markers=True, hash="md5")
+    names = [a.name for a in analyzers.build_analyzers(args)]
+    assert names == ["lines", "grep", "markers", "hash"]
+    assert [a.name for a in analyzers.build_analyzers(argparse.Namespace())] == ["lines"]
+
+
+def test_analyzers_on_one_buffer():
+    grep = analyzers.GrepAnalyzer(r"\bos\b")
+    assert analyzers.LineCounter().analyze(DATA) == 4
+    assert grep.analyze(DATA) == 2
+    assert analyzers.GrepAnalyzer(r"^def ").analyze(DATA) == 1
+    assert analyzers.MarkerCounter().analyze(DATA) == {"TODO": 2, "FIXME": 1}
+    assert analyzers.Hasher("sha1").analyze(DATA) == hashlib.sha1(DATA).hexdigest()
+
+
+def test_file_is_read_once_for_every_analyzer(tmp_path, monkeypatch):
+    path = tmp_path / "a.py"
+    path.write_bytes(DATA)
+    reads = []
+    real_open = open
+
+    def counting_open(*args, **kwargs):
+        f = real_open(*args, **kwargs)
+        reads.append(args[0])
+        return f
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    pipeline = analyzers.build_analyzers(argparse.Namespace(grep="os", markers=True, hash="sha256"))
+    values, status = counting.analyze_file(str(path), pipeline)
+    assert status == "counted"
+    assert reads == [str(path)]
+    assert set(values) == {"lines", "grep", "markers", "hash"}
+
+
+def test_totals_and_merge_totals():
+    grep = analyzers.GrepAnalyzer("os")
+    markers = analyzers.MarkerCounter()
+    hasher = analyzers.Hasher()
+    first = {"grep": grep.empty_total(), "markers": markers.empty_total(), "hash": hasher.empty_total()}
+    grep.add(first["grep"], 3)
+    grep.add(first["grep"], 0)
+    markers.add(first["markers"], {"TODO": 2})
+    hasher.add(first["hash"], "abc")
+    assert first["grep"] == {"pattern": "os", "matches": 3, "files": 1}
+
+    second = {"grep": {"pattern": "os", "matches": 4, "files": 2}, "markers": {"FIXME": 1}}
+    merged = analyzers.merge_totals(first, second)
+    assert merged["grep"] == {"pattern": "os", "matches": 7, "files": 3}
+    assert merged["markers"]["TODO"] == 2 and merged["markers"]["FIXME"] == 1
+    assert merged["hash"] == {"algorithm": "sha256", "files": 1}
+    # The inputs are left alone
+    assert first["grep"]["matches"] == 3
+    assert analyzers.merge_totals({}, second) == second
@@ -0,0 +1,101 @@
+import io
+import tarfile
+import zipfile
+import argparse
+
+import pytest
+
+from VLTRE import archives, scanner
+
+BIG = b"value = 1\n" * 5000
+
+
+def tar_bytes(members, mode="w:gz"):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as tf:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def scan_args(**overrides):
+    args = argparse.Namespace(ext=[".py"], archives=True)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def find(node, *names):
+    for name in names:
+        node = next(child for child in node["children"] if child["name"] == name)
+    return node
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("dist/pkg-1.0.whl", True), ("a.ZIP", True), ("src.tar.gz", True), ("src.tgz", True),
+    ("data.tar.xz", True), ("notes.gz", False), ("archive.py", False),
+])
+def test_is_archive(name, expected):
+    assert archives.is_archive(name) is expected
+
+
+@pytest.mark.parametrize("name, payload", [
+    ("pkg.zip", zip_bytes({"pkg/a.py": b"x\n" * 3, "pkg/empty/": b""})),
+    ("pkg.tar.gz", tar_bytes({"pkg/a.py": b"x\n" * 3})),
+], ids=["zip", "tar"])
+def test_iter_members(tmp_path, name, payload):
+    (tmp_path / name).write_bytes(payload)
+    members = []
+    for member, size, opener in archives.iter_members(str(tmp_path / name), name):
+        with opener() as f:
+            members.append((member, size, f.read()))
+    assert members == [("pkg/a.py", 6, b"x\n" * 3)]
+
+
+def test_scan_zip_tar_and_nested_archives(tmp_path):
+    inner = zip_bytes({"inner/mod.py": b"x = 1\n" * 4})
+    (tmp_path / "lib.whl").write_bytes(zip_bytes({"lib/a.py": b"x\n" * 2, "lib/inner.zip": inner}))
+    (tmp_path / "src.tar.gz").write_bytes(tar_bytes({"src/b.py": b"x\n" * 7, "src/README": b"text\n"}))
+    result = scanner.scan_root(str(tmp_path), scan_args())
+    assert result["archives"] == 3
+    assert result["archive_members"] == 5
+    assert result["total_lines"] == 13
+    assert result["errors"] == 0
+    root = result["tree"][0]
+    assert find(root, "lib.whl", "lib", "inner.zip", "inner", "mod.py")["lines"] == 4
+    assert find(root, "src.tar.gz", "src", "b.py")["lines"] == 7
+    paths = [item[1] for item in result["largest"]]
+    assert str(tmp_path / "src.tar.gz") + archives.MEMBER_SEP + "src/b.py" in paths
+
+
+def test_nested_archives_stop_at_the_depth_limit(tmp_path):
+    inner = zip_bytes({"mod.py": b"x\n"})
+    (tmp_path / "outer.zip").write_bytes(zip_bytes({"inner.zip": inner}))
+    result = scanner.scan_root(str(tmp_path), scan_args(archive_depth=1))
+    assert result["archives"] == 1
+    assert result["total_lines"] == 0
+    assert find(result["tree"][0], "outer.zip", "inner.zip")["type"] == "file"
+
+
+@pytest.mark.parametrize("name, payload, status", [
+    # Zip members can seek, so they are sampled; tar members are a forward-only stream
+    ("big.zip", zip_bytes({"big.py": BIG}), "estimated"),
+    ("big.tar.gz", tar_bytes({"big.py": BIG}), "too_large"),
+], ids=["zip", "tar"])
+def test_over_cap_members_with_estimate_large(tmp_path, name, payload, status):
+    (tmp_path / name).write_bytes(payload)
+    result = scanner.scan_root(str(tmp_path), scan_args(max_file_bytes=1000, estimate_large=True))
+    assert result["errors"] == result["unreadable_files"] == 0
+    assert find(result["tree"][0], name, "big.py")["status"] == status
+    assert result["skipped_large"] == (status == "too_large")
+    assert result["estimated_files"] == (status == "estimated")
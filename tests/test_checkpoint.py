@@ -0,0 +1,108 @@
+import os
+import time
+import random
+import argparse
+
+import pytest
+
+from VLTRE import checkpoint, sampling, scanner
+
+
+def make_tree(root):
+    for i in range(3):
+        sub = root / f"pkg{i}" / "sub"
+        sub.mkdir(parents=True)
+        for j in range(3):
+            (root / f"pkg{i}" / f"mod{j}.py").write_text("a = 1\n" * (j + 1))
+            (sub / f"leaf{j}.py").write_text("b = 2\n\nc = 3\n")
+    (root / "empty").mkdir()
+
+
+def scan_args(**overrides):
+    args = argparse.Namespace(ext=[".py"], top=10, checkpoint_interval=0.0, resume=False)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def totals(result):
+    return {key: result[key] for key in ("dirs", "files", "counted_files", "total_lines", "pending_dirs")}
+
+
+def test_resumed_scan_matches_uninterrupted_scan(tmp_path, monkeypatch):
+    root = tmp_path / "root"
+    root.mkdir()
+    make_tree(root)
+    expected = totals(scanner.scan_root(str(root), scan_args()))
+
+    # A clock that advances on every reading makes the deadline fall at
+    # every possible point of the walk, including before a directory's
+    # first entry
+    ticks = iter(range(10 ** 6))
+    monkeypatch.setattr(time, "monotonic", lambda: float(next(ticks)))
+    path = str(tmp_path / "scan.ckpt")
+    args = scan_args(resume=True)
+    for attempt in range(500):
+        result = scanner.scan_root(str(root), args, deadline=time.monotonic() + 4 + attempt % 9,
+                                   checkpoint_file=path)
+        if not result["pending_dirs"]:
+            break
+    else:
+        raise AssertionError("scan never finished")
+    assert totals(result) == expected
+
+
+def test_finished_checkpoint_starts_a_new_scan(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    make_tree(root)
+    path = str(tmp_path / "scan.ckpt")
+    args = scan_args(resume=True)
+    first = scanner.scan_root(str(root), args, checkpoint_file=path)
+    assert first["pending_dirs"] == 0
+
+    (root / "pkg0" / "new.py").write_text("x = 1\n" * 10)
+    options = dict(scanner.scan_options(args), estimate=None, seed=None)
+    assert checkpoint.load(path, str(root), options) is None
+    second = scanner.scan_root(str(root), args, checkpoint_file=path)
+    assert second["total_lines"] == first["total_lines"] + 10
+    assert second["files"] == first["files"] + 1
+    assert os.path.exists(path)
+
+
+def test_save_load_round_trip(tmp_path):
+    root_node = {"name": "/r", "type": "dir", "children": []}
+    sub = {"name": "sub", "type": "dir", "children": []}
+    deeper = {"name": "deeper", "type": "dir", "children": []}
+    sample = {"name": "x.py", "type": "file", "lines": 0, "size": 40, "status": "extrapolated"}
+    root_node["children"] = [sub, sample]
+    sub["children"] = [deeper]
+    queue = [("/r/sub/deeper", deeper, 2, 0), ("/r/sub", sub, 1, 3)]
+    rng = sampling.make_rng(5, "/r")
+    rng.random()
+    path = str(tmp_path / "scan.ckpt")
+    options = {"ext": [".py"]}
+    checkpoint.save(path, "/r", options, {"dirs": 2}, root_node, queue, [(9, "/r/a.py", False)],
+                    {".py|3": [1, 40, 0, 0, 0, 0, 0, 0]}, [(sample, ".py|3", ".py", "/r/x.py")], rng)
+    # Nothing is left attached to the live tree
+    assert "_queued" not in sub and "_unsampled" not in sample
+
+    state = checkpoint.load(path, "/r", options)
+    assert state["result"] == {"dirs": 2}
+    assert [(folder, depth, start) for folder, _, depth, start in state["queue"]] == \
+        [("/r/sub/deeper", 2, 0), ("/r/sub", 1, 3)]
+    # Queued and unsampled entries refer to the nodes of the loaded tree
+    tree_sub = state["tree"]["children"][0]
+    assert state["queue"][1][1] is tree_sub
+    assert state["queue"][0][1] is tree_sub["children"][0]
+    assert state["unsampled"][0][0] is state["tree"]["children"][1]
+    assert state["largest"] == [(9, "/r/a.py", False)]
+    restored = random.Random()
+    restored.setstate(state["rng"])
+    assert restored.random() == rng.random()
+
+    with pytest.raises(ValueError):
+        checkpoint.load(path, "/other", options)
+    with pytest.raises(ValueError):
+        checkpoint.load(path, "/r", {"ext": [".js"]})
+    assert checkpoint.load(str(tmp_path / "missing"), "/r", options) is None
@@ -1,40 +1,160 @@
-import subprocess
-import sys
 import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+
+EXIT_OK, EXIT_ERROR, EXIT_USAGE, EXIT_INCOMPLETE = 0, 1, 2, 3
+
+
+@pytest.fixture
+def project(tmp_path):
+    src = tmp_path / "project" / "src"
+    src.mkdir(parents=True)
+    (src / "main.py").write_text("import os\n\ndef main():\n    return os.sep\n")
+    (src / "util.py").write_text("def helper():\n    pass\n")
+    (tmp_path / "project" / "README.md").write_text("# project\n")
+    return tmp_path / "project"
+
+
+def run_cli(args, home, batch=True):
+    env = dict(os.environ, HOME=str(home), PYTHONUTF8="1")
+    prefix = ["--batch", "--no-daemon"] if batch else []
+    return subprocess.run([sys.executable, "-m", "VLTRE.cli"] + prefix + args,
+                          capture_output=True, text=True, cwd=REPO, env=env, timeout=120)
+
+
+def test_json_output(project, tmp_path):
+    proc = run_cli([str(project), "--ext", ".py", "--json"], tmp_path)
+    assert proc.returncode == EXIT_OK, proc.stderr
+    result = json.loads(proc.stdout)
+    assert result["files"] == 3
+    assert result["total_lines"] == 5
+    assert result["by_ext"] == {".py": 5}
+
+
+def test_batch_stdout_is_only_the_report(project, tmp_path):
+    proc = run_cli([str(project), "--ext", ".py"], tmp_path)
+    assert proc.returncode == EXIT_OK, proc.stderr
+    assert "[DEBUG]" not in proc.stdout and "[INFO]" not in proc.stdout
+    assert "main.py" in proc.stdout
+    # Batch mode neither shows the banner nor touches the progress file
+    assert not (tmp_path / ".pot_progress.json").exists()
+    assert not (tmp_path / ".pot_progress.d").exists()
+
+
+def test_missing_root_is_an_error(tmp_path):
+    proc = run_cli([str(tmp_path / "nonexistent_dir")], tmp_path)
+    assert proc.returncode == EXIT_ERROR
+    assert "does not exist" in proc.stderr
+    assert proc.stdout == ""
+
+
+def test_unreadable_file_makes_the_scan_incomplete(project, tmp_path):
+    (project / "src" / "broken.py").symlink_to(project / "src" / "gone.py")
+    proc = run_cli([str(project), "--ext", ".py", "--json"], tmp_path)
+    assert proc.returncode == EXIT_INCOMPLETE
+    assert "broken.py" in proc.stderr
+    result = json.loads(proc.stdout)
+    assert result["unreadable_files"] == 1
+    assert result["errors"] == 1
+    assert result["total_lines"] == 5
+
+    proc = run_cli([str(project), "--ext", ".py"], tmp_path)
+    assert proc.returncode == EXIT_INCOMPLETE
+    assert "Unreadable: 1" in proc.stdout
+
+
+def test_resume_requires_a_checkpoint(project, tmp_path):
+    proc = run_cli([str(project), "--resume"], tmp_path)
+    assert proc.returncode == EXIT_USAGE
+    assert "--checkpoint" in proc.stderr
+
+
+def test_checkpoint_and_resume(project, tmp_path):
+    checkpoint_file = tmp_path / "scan.ckpt"
+    first = run_cli([str(project), "--ext", ".py", "--json", "--checkpoint", str(checkpoint_file)], tmp_path)
+    assert first.returncode == EXIT_OK, first.stderr
+    assert checkpoint_file.exists()
+    resumed = run_cli([str(project), "--ext", ".py", "--json", "--checkpoint", str(checkpoint_file),
+                       "--resume"], tmp_path)
+    assert resumed.returncode == EXIT_OK, resumed.stderr
+    assert json.loads(resumed.stdout)["total_lines"] == json.loads(first.stdout)["total_lines"]
+
+
+def test_where_filter(project, tmp_path):
+    proc = run_cli([str(project), "--ext", ".py", "--json", "--where", "name == main.py"], tmp_path)
+    assert proc.returncode == EXIT_OK, proc.stderr
+    result = json.loads(proc.stdout)
+    assert result["files"] == 1
+    assert result["total_lines"] == 3
+
+
+def test_invalid_where_is_a_usage_error(project, tmp_path):
+    proc = run_cli([str(project), "--where", "size >"], tmp_path)
+    assert proc.returncode == EXIT_USAGE
+    assert "Invalid --where expression" in proc.stderr
+
+
+@pytest.mark.parametrize("fraction", ["0", "1.5", "-0.1", "abc"])
+def test_estimate_fraction_out_of_range(project, tmp_path, fraction):
+    proc = run_cli([str(project), "--estimate", fraction], tmp_path)
+    assert proc.returncode == EXIT_USAGE
+    assert "--estimate" in proc.stderr
+
+
+def test_estimate_reports_a_confidence_interval(project, tmp_path):
+    proc = run_cli([str(project), "--ext", ".py", "--json", "--estimate", "1", "--seed", "3"], tmp_path)
+    assert proc.returncode == EXIT_OK, proc.stderr
+    result = json.loads(proc.stdout)
+    # Every file is in the sample, so the estimate is exact
+    assert result["total_lines"] == 5
+    assert result["estimate"]["fraction"] == 1.0
+
+
+def test_save_partial_and_merge(project, tmp_path):
+    partial = tmp_path / "part.json"
+    proc = run_cli([str(project), "--ext", ".py", "--save-partial", str(partial)], tmp_path)
+    assert proc.returncode == EXIT_OK, proc.stderr
+    proc = run_cli(["merge", str(partial), str(partial), "--json"], tmp_path, batch=False)
+    assert proc.returncode == EXIT_OK, proc.stderr
+    assert json.loads(proc.stdout)["total_lines"] == 10
+
+
+def test_merge_refuses_partials_with_different_options(project, tmp_path):
+    first, second = tmp_path / "first.json", tmp_path / "second.json"
+    assert run_cli([str(project), "--ext", ".py", "--save-partial", str(first)], tmp_path).returncode == EXIT_OK
+    assert run_cli([str(project), "--ext", ".md", "--save-partial", str(second)], tmp_path).returncode == EXIT_OK
+    proc = run_cli(["merge", str(first), str(second), "--json"], tmp_path, batch=False)
+    assert proc.returncode == EXIT_ERROR
+    assert "different options" in proc.stderr
+
+
+def test_grep(project, tmp_path):
+    proc = run_cli([str(project), "--ext", ".py", "--json", "--grep", "def "], tmp_path)
+    assert proc.returncode == EXIT_OK, proc.stderr
+    assert json.loads(proc.stdout)["analysis"]["grep"]["matches"] == 2
+
+
+def test_invalid_grep_is_a_usage_error(project, tmp_path):
+    proc = run_cli([str(project), "--grep", "("], tmp_path)
+    assert proc.returncode == EXIT_USAGE
+    assert "Invalid --grep pattern" in proc.stderr
+    assert "Traceback" not in proc.stderr
+
+
+def test_time_budget_marks_the_result_partial(project, tmp_path):
+    proc = run_cli([str(project), "--ext", ".py", "--json", "--time-budget", "0.000001"], tmp_path)
+    assert proc.returncode == EXIT_INCOMPLETE
+    result = json.loads(proc.stdout)
+    assert result["complete"] is False
+    assert result["pending_dirs"] == len(result["truncated"]) >= 1
 
-# Set environment variable to enable UTF-8 mode
-if os.name == 'nt':
-    os.system('chcp 65001 >NUL')
-    os.environ['PYTHONUTF8'] = '1'
-    sys.stdout = open(sys.stdout.fileno(), mode='w', encoding='utf-8', buffering=1)
-
-def run_cli_test(args, description):
-    print(f"\n=== Running test: {description} ===")
-    cmd = [sys.executable, "-m", "pot.cli"] + args
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print("Output:\n", result.stdout)
-        if result.stderr:
-            print("Errors:\n", result.stderr)
-        print(f"--- Test '{description}' completed successfully ---")
-    except subprocess.CalledProcessError as e:
-        print(f"Error during '{description}': {e}")
-        print("Stdout:\n", e.stdout)
-        print("Stderr:\n", e.stderr)
-
-if __name__ == "__main__":
-    # Basic tests
-    run_cli_test(["--list-drives"], "List drives")
-    run_cli_test(["--root", "./nonexistent_dir"], "Invalid directory")
-    run_cli_test(["--json", "--root", "./"], "JSON output in current directory")
-    run_cli_test(["--copy", "--root", "./"], "Copy report in current directory")
-    
-    # Additional tests based on provided options
-    run_cli_test(["--output", "test_output.txt"], "Save output to file")
-    run_cli_test(["--open-url"], "Open report in browser")
-    run_cli_test(["--verbose"], "Enable verbose output")
-    run_cli_test(["--exclude", "node_modules", "tests"], "Exclude directories")
-    run_cli_test(["--max-depth", "2"], "Limit directory traversal depth to 2")
-    run_cli_test(["--show-largest", "--top", "5"], "Show top 5 largest files")
-    
-    # You can add more specific tests as needed
\ No newline at end of file
+    proc = run_cli([str(project), "--ext", ".py", "--time-budget", "0.000001"], tmp_path)
+    assert proc.returncode == EXIT_INCOMPLETE
+    assert "[truncated]" in proc.stdout
+    assert "directories pending; results are partial" in proc.stdout
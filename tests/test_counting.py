@@ -0,0 +1,87 @@
+import os
+import argparse
+
+import pytest
+
+from VLTRE import analyzers, counting
+
+
+@pytest.fixture
+def pipeline():
+    return analyzers.build_analyzers(argparse.Namespace())
+
+
+@pytest.mark.parametrize("block, expected", [
+    (b"", False),
+    (b"def main():\n    return 1\n", False),
+    ("naïve café – ünïcode\n".encode("utf-8"), False),
+    (b"text with a \0 byte", True),
+    (bytes(range(1, 32)) * 10, True),
+])
+def test_is_binary(block, expected):
+    assert counting.is_binary(block) is expected
+
+
+def test_count_nonblank():
+    assert counting.count_nonblank(b"a\n\n  \nb\r\n\tc") == 3
+
+
+def test_estimate_lines_of_a_regular_file(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"some line of text\n\n" * 100_000)
+    with open(path, "rb") as f:
+        estimate = counting.estimate_lines(f, path.stat().st_size)
+    assert estimate == pytest.approx(100_000, rel=0.05)
+
+
+def test_estimate_lines_of_one_huge_line(tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_bytes(b'{"k": "' + b"v" * 3_000_000 + b'"}')
+    with open(path, "rb") as f:
+        assert counting.estimate_lines(f, path.stat().st_size) == 1
+
+
+def test_estimate_lines_of_blank_content(tmp_path):
+    path = tmp_path / "blank.txt"
+    path.write_bytes(b" \n" * 500_000)
+    with open(path, "rb") as f:
+        assert counting.estimate_lines(f, path.stat().st_size) == 0
+
+
+def test_analyze_file_counts_small_text(tmp_path, pipeline):
+    path = tmp_path / "a.py"
+    path.write_bytes(b"x = 1\n\ny = 2\n")
+    assert counting.analyze_file(str(path), pipeline) == ({"lines": 2}, "counted")
+
+
+def test_analyze_file_skips_binary(tmp_path, pipeline):
+    path = tmp_path / "a.py"
+    path.write_bytes(b"\x7fELF\0\0\0" + bytes(1000))
+    assert counting.analyze_file(str(path), pipeline) == ({}, "binary")
+
+
+def test_analyze_file_cap(tmp_path, pipeline):
+    path = tmp_path / "big.py"
+    path.write_bytes(b"value = 1\n" * 50_000)
+    size = path.stat().st_size
+    assert counting.analyze_file(str(path), pipeline, max_bytes=size) == ({"lines": 50_000}, "counted")
+    assert counting.analyze_file(str(path), pipeline, max_bytes=size - 1) == ({}, "too_large")
+    values, status = counting.analyze_file(str(path), pipeline, max_bytes=1000, estimate=True)
+    assert status == "estimated"
+    assert values["lines"] == pytest.approx(50_000, rel=0.05)
+
+
+def test_analyze_file_reports_unreadable_files(tmp_path, pipeline):
+    os.symlink(tmp_path / "gone.py", tmp_path / "broken.py")
+    assert counting.analyze_file(str(tmp_path / "broken.py"), pipeline) == ({}, "error")
+
+
+@pytest.mark.parametrize("status, size, expected", [
+    ("counted", 5000, 5000),
+    ("binary", 10 ** 6, counting.SNIFF_BYTES),
+    ("too_large", 100, 100),
+    ("estimated", 10 ** 9, counting.SNIFF_BYTES + counting.SAMPLE_CHUNKS * counting.SAMPLE_CHUNK_BYTES),
+    ("error", 5000, 0),
+])
+def test_bytes_read(status, size, expected):
+    assert counting.bytes_read(status, size) == expected
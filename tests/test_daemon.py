@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+from VLTRE import daemon, scanner
+from VLTRE.config import parse_args
+
+pytestmark = pytest.mark.skipif(not daemon.available(), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def scan_args(monkeypatch):
+    """Parse pot's command line, so the options sent to the daemon have their CLI defaults."""
+    def parse(*argv):
+        monkeypatch.setattr(sys, "argv", ["pot", "--ext", ".py", "--top", "3"] + list(argv))
+        return parse_args()
+    return parse
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "a.py").write_text("x = 1\n" * 5)
+    (root / "b.py").write_text("y = 2\n" * 3)
+    return root
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / "d.sock")
+    thread = threading.Thread(target=daemon.serve, args=(path, 0.0), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path):
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.01)
+    yield path
+    assert daemon.stop(path)
+    thread.join(10)
+    assert not thread.is_alive()
+
+
+def without_elapsed(result):
+    return dict(result, elapsed=None)
+
+
+def test_daemon_output_matches_an_in_process_scan(tree, socket_path, scan_args):
+    args = scan_args()
+    served = daemon.try_scan([str(tree)], args, socket_path)
+    assert served["total_lines"] == 8
+    assert without_elapsed(served) == without_elapsed(scanner.scan_roots([str(tree)], args))
+
+    # A changed file is picked up by the next request
+    (tree / "pkg" / "a.py").write_text("x = 1\n" * 40)
+    (tree / "pkg" / "c.py").write_text("z = 3\n")
+    served = daemon.try_scan([str(tree)], args, socket_path)
+    assert served["total_lines"] == 44
+    assert without_elapsed(served) == without_elapsed(scanner.scan_roots([str(tree)], args))
+
+
+def test_local_only_options_are_not_served(tree, socket_path, scan_args):
+    assert daemon.try_scan([str(tree)], scan_args("--time-budget", "5"), socket_path) is None
+    assert daemon.try_scan([str(tree)], scan_args(), socket_path + ".missing") is None
+
+
+def test_results_are_served_without_a_rescan_within_refresh(tree, monkeypatch, scan_args):
+    entry = daemon.Entry(str(tree), scanner.scan_options(scan_args()))
+    payload = entry.get(daemon.DEFAULT_REFRESH)
+    scans = []
+    monkeypatch.setattr(scanner, "scan_root", lambda *a, **k: scans.append(a))
+    assert entry.get(daemon.DEFAULT_REFRESH) is payload
+    assert scans == []
+
+
+def test_unchanged_results_are_not_serialised_again(tree, scan_args):
+    entry = daemon.Entry(str(tree), scanner.scan_options(scan_args()))
+    payload = entry.get(0)
+    assert entry.get(0) is payload
+    (tree / "b.py").write_text("y = 2\n" * 30)
+    assert entry.get(0) is not payload
+
+
+def test_client_waits_for_a_slow_first_scan(tree, socket_path, scan_args, monkeypatch):
+    scan_root = scanner.scan_root
+
+    def slow_scan(*args, **kwargs):
+        time.sleep(0.5)
+        return scan_root(*args, **kwargs)
+
+    # The daemon runs in this process, so it picks up the slow scan too
+    monkeypatch.setattr(daemon, "CONNECT_TIMEOUT", 0.1)
+    monkeypatch.setattr(scanner, "scan_root", slow_scan)
+    served = daemon.try_scan([str(tree)], scan_args(), socket_path)
+    assert served is not None and served["total_lines"] == 8
@@ -0,0 +1,81 @@
+import pytest
+
+from VLTRE import filters
+
+
+def test_parse_precedence_and_normalisation():
+    tree = filters.parse("ext == py and size > 10k or not depth < 2")
+    assert tree == (
+        "or",
+        ("and", ("cmp", "ext", "==", ".py"), ("cmp", "size", ">", 10240.0)),
+        ("not", ("cmp", "depth", "<", 2)),
+    )
+
+
+def test_parse_parentheses_and_quoted_values():
+    tree = filters.parse("(name ~ 'test_*' or path == \"a b/c.py\") and lines >= 5")
+    assert tree == (
+        "and",
+        ("or", ("cmp", "name", "~", "test_*"), ("cmp", "path", "==", "a b/c.py")),
+        ("cmp", "lines", ">=", 5),
+    )
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "colour == red",
+    "size ~ 10k",
+    "name > foo",
+    "size > lots",
+    "(ext == py",
+    "ext == py size > 1",
+    "lines >",
+])
+def test_parse_rejects_malformed_expressions(text):
+    with pytest.raises(ValueError):
+        filters.parse(text)
+
+
+def test_matches_file_is_undecided_until_lines_are_known():
+    tree = filters.parse("ext == py and lines > 10")
+    facts = {"path": "src/a.py", "name": "a.py", "ext": ".py", "size": 100, "mtime": 0, "depth": 2}
+    assert filters.matches_file(tree, facts) is None
+    assert filters.matches_file(tree, dict(facts, lines=11)) is True
+    assert filters.matches_file(tree, dict(facts, lines=3)) is False
+    # A file that was not counted never matches a lines test
+    assert filters.matches_file(tree, dict(facts, lines=None)) is False
+    # Decided without lines when the other side settles it
+    assert filters.matches_file(tree, dict(facts, ext=".md")) is False
+    assert filters.matches_file(filters.parse("ext == py or lines > 10"), facts) is True
+
+
+@pytest.mark.parametrize("expression, rel_path, depth, expected", [
+    ("path ~ 'src/*'", "docs", 1, False),
+    ("path ~ 'src/*'", "src", 1, True),
+    ("path ~ 'src/*'", "src/sub", 2, True),
+    ("path ~ 'src/a*'", "src", 1, None),
+    ("path ~ 'src/a*'", "srcx", 1, False),
+    ("path == 'src/a.py'", "src", 1, None),
+    ("path == 'src/a.py'", "lib", 1, False),
+    ("path != 'src/a.py'", "lib", 1, None),
+    ("not path ~ 'build/*'", "build", 1, False),
+    ("not path ~ 'build/*'", "lib", 1, True),
+    ("depth <= 2", "a/b", 2, False),
+    ("depth <= 2", "a", 1, None),
+    ("depth > 1", "a", 1, True),
+    ("depth > 1", "", 0, None),
+    ("depth != 1", "a", 1, True),
+    ("ext == py", "src", 1, None),
+    ("ext == py and depth < 2", "a", 1, False),
+    ("ext == py or depth > 1", "a", 1, True),
+])
+def test_matches_dir(expression, rel_path, depth, expected):
+    assert filters.matches_dir(filters.parse(expression), rel_path, depth) is expected
+
+
+def test_matches_dir_never_prunes_a_matching_file():
+    tree = filters.parse("path ~ 'src/pkg/*.py' and depth >= 3")
+    assert filters.matches_dir(tree, "src", 1) is None
+    assert filters.matches_dir(tree, "src/pkg", 2) is None
+    facts = {"path": "src/pkg/mod.py", "name": "mod.py", "ext": ".py", "size": 1, "mtime": 0, "depth": 3}
+    assert filters.matches_file(tree, facts) is True
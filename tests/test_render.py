@@ -0,0 +1,94 @@
+import re
+
+from VLTRE import render
+
+ANSI = re.compile(r"\033\[[0-9;]*m")
+
+
+def file(name, lines=0, **extra):
+    return dict({"name": name, "type": "file", "lines": lines, "size": lines * 10}, **extra)
+
+
+def folder(name, *children, **extra):
+    return dict({"name": name, "type": "dir", "children": list(children)}, **extra)
+
+
+def sample_tree():
+    return [
+        folder("a",
+               file("x.py", 12),
+               folder("b", file("y.py", 3), folder("c", file("deep.py", 1))),
+               folder("empty")),
+        folder("d", file("w.py", 5)),
+        file("z.py", 400),
+    ]
+
+
+def render_lines(nodes, cli_mode=False, **kwargs):
+    return [line for chunk in render.iter_chunks(nodes, cli_mode, **kwargs) for line in chunk]
+
+
+def test_last_child_glyphs():
+    names = [line[:render.NAME_COLUMN].rstrip() for line in render_lines(sample_tree())]
+    assert names == [
+        "├── a/",
+        "│   ├── x.py",
+        "│   ├── b/",
+        "│   │   ├── y.py",
+        "│   │   └── c/",
+        "│   │       └── deep.py",
+        "│   └── empty/",
+        "├── d/",
+        "│   └── w.py",
+        "└── z.py",
+    ]
+
+
+def test_counts_start_in_one_column():
+    lines = [line for line in render_lines(sample_tree()) if line.rstrip()[-1].isdigit()]
+    assert len(lines) == 5
+    for line in lines:
+        assert len(line) == render.NAME_COLUMN + 7
+    assert lines[0].endswith("     12")
+
+
+def test_colour_codes_do_not_shift_columns():
+    plain = render_lines(sample_tree(), cli_mode=False)
+    coloured = render_lines(sample_tree(), cli_mode=True)
+    assert coloured != plain
+    assert [ANSI.sub("", line) for line in coloured] == plain
+
+
+def test_directory_rollups_and_markers_are_aligned():
+    nodes = [folder("src", file("a.py", 7), lines=7, files=1, size=70, truncated=True)]
+    line = render_lines(nodes)[0]
+    assert line.startswith("└── src/ ")
+    assert line.index("      7  (1 files, 70 B)") == render.NAME_COLUMN
+    assert line.endswith("[truncated]")
+
+
+def test_long_names_keep_one_space():
+    name = "n" * (render.NAME_COLUMN + 5) + ".py"
+    assert render_lines([file(name, 2)]) == [f"└── {name}       2"]
+
+
+def test_file_statuses():
+    nodes = [file("a.bin", status="binary"), file("b.py", 50, status="estimated"),
+             file("c.py", status="too_large"), file("d.txt")]
+    lines = render_lines(nodes)
+    assert lines[0].endswith(" binary")
+    assert lines[1].endswith("~    50")
+    assert lines[2].endswith("too_large")
+    assert lines[3] == "└── d.txt"
+
+
+def test_chunking_does_not_change_the_output():
+    nodes = [folder(f"dir{i}", *(file(f"f{j}.py", j) for j in range(1, 5))) for i in range(20)]
+    chunks = list(render.iter_chunks(nodes, False, batch=7))
+    assert len(chunks) > 1
+    assert [line for chunk in chunks for line in chunk] == render_lines(nodes)
+
+
+def test_size_only_shows_bytes():
+    nodes = [file("a.bin", size=2048)]
+    assert render_lines(nodes, size_only=True)[0].endswith("2.0 KB")
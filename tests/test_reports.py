@@ -0,0 +1,74 @@
+import pytest
+
+from VLTRE import reports, scanner
+
+
+def test_fold_small_keeps_the_largest_entries():
+    values = {".py": 500, ".js": 300, ".md": 150, ".txt": 40, ".cfg": 5, ".ini": 5, ".none": 0}
+    assert reports.fold_small(values, max_items=10, min_share=0.02) == [
+        (".py", 500), (".js", 300), (".md", 150), (".txt", 40), ("other", 10)]
+
+
+def test_fold_small_limits_the_number_of_slices():
+    values = {f".e{i}": 100 + i for i in range(30)}
+    slices = reports.fold_small(values, max_items=5)
+    assert len(slices) == 5
+    assert slices[-1][0] == "other"
+    assert sum(value for _, value in slices) == sum(values.values())
+
+
+def test_fold_small_of_nothing():
+    assert reports.fold_small({}) == []
+    assert reports.fold_small({".py": 0}) == []
+
+
+def wide_tree(dirs=40, files=25):
+    root = {"name": "/r", "type": "dir", "children": []}
+    for i in range(dirs):
+        sub = {"name": f"d{i}", "type": "dir", "children": [
+            {"name": f"f{j}.py", "type": "file", "lines": i + j + 1, "size": 10} for j in range(files)]}
+        root["children"].append(sub)
+    root["children"].append({"name": "top.py", "type": "file", "lines": 7, "size": 10})
+    scanner.aggregate(root)
+    return root
+
+
+@pytest.mark.parametrize("max_rects", [1, 2, 10, 41, 64, 200, 2000])
+def test_treemap_items_stay_within_the_limit(max_rects):
+    root = wide_tree()
+    items = reports.treemap_items([root], max_rects)
+    assert 0 < len(items) <= max_rects
+    assert sum(value for _, value in items) == root["lines"]
+    assert [value for _, value in items] == sorted((value for _, value in items), reverse=True)
+
+
+def test_treemap_items_expand_the_heaviest_directories():
+    root = wide_tree(files=20)
+    items = dict(reports.treemap_items([root], 64))
+    # 40 directories plus top.py fit; then only the heaviest one can be split
+    assert "/r/top.py" in items
+    assert "/r/d39" not in items
+    assert "/r/d39/f19.py" in items
+    assert "/r/d38" in items
+    assert len(items) == 60
+
+
+def test_squarify_fills_the_rectangle():
+    values = [50, 30, 10, 6, 4]
+    rects = reports.squarify(values, 0, 0, 20, 10)
+    assert len(rects) == len(values)
+    for (x, y, w, h), value in zip(rects, values):
+        assert w * h == pytest.approx(value * 200 / 100)
+        assert -1e-9 <= x and x + w <= 20 + 1e-9
+        assert -1e-9 <= y and y + h <= 10 + 1e-9
+
+
+def test_graphs_are_saved_without_a_display(tmp_path, monkeypatch):
+    pytest.importorskip("matplotlib")
+    monkeypatch.delenv("DISPLAY", raising=False)
+    pie = tmp_path / "pie.png"
+    reports.show_pie_chart({".py": 10, ".md": 3}, save_path=str(pie))
+    assert pie.read_bytes().startswith(b"\x89PNG")
+    treemap = tmp_path / "treemap.png"
+    reports.show_treemap([wide_tree(5, 3)], save_path=str(treemap))
+    assert treemap.read_bytes().startswith(b"\x89PNG")
@@ -0,0 +1,61 @@
+import pytest
+
+from VLTRE import sampling
+
+
+def make_stratum(population, sampled):
+    """population: sizes of every file; sampled: (size, lines) of the opened ones."""
+    stratum = sampling.new_stratum()
+    for size in population:
+        sampling.add_file(stratum, size)
+    for size, lines in sampled:
+        sampling.add_sample(stratum, size, lines)
+    return stratum
+
+
+def test_empty_stratum_estimates_nothing():
+    assert sampling.estimate(sampling.new_stratum()) == (0.0, 0.0)
+
+
+def test_fully_sampled_stratum_is_exact():
+    stratum = make_stratum([100, 200, 300], [(100, 7), (200, 9), (300, 40)])
+    assert sampling.estimate(stratum) == (56.0, 0.0)
+
+
+def test_constant_ratio_has_no_variance():
+    stratum = make_stratum([100] * 6 + [400] * 4, [(100, 10), (100, 10), (400, 40)])
+    total, variance = sampling.estimate(stratum)
+    assert total == pytest.approx(220.0)
+    assert variance == pytest.approx(0.0, abs=1e-6)
+
+
+def test_single_sample_is_reported_as_fully_uncertain():
+    stratum = make_stratum([100] * 5, [(100, 20)])
+    assert sampling.estimate(stratum) == (100.0, 10000.0)
+
+
+def test_varying_ratio_gives_a_confidence_interval():
+    stratum = make_stratum([100] * 20, [(100, 5), (100, 15), (100, 10)])
+    total, variance = sampling.estimate(stratum)
+    assert total == pytest.approx(200.0)
+    assert variance > 0
+    assert sampling.ci95(variance) == pytest.approx(sampling.Z_95 * variance ** 0.5)
+
+
+def test_first_files_of_a_stratum_are_always_opened():
+    stratum = sampling.new_stratum()
+    rng = sampling.make_rng(1, "root")
+    for _ in range(sampling.MIN_SAMPLES):
+        assert sampling.should_sample(stratum, 0.0, rng)
+        sampling.add_sample(stratum, 10, 1)
+    assert not sampling.should_sample(stratum, 0.0, rng)
+
+
+def draws(seed, root):
+    rng = sampling.make_rng(seed, root)
+    return [rng.random() for _ in range(3)]
+
+
+def test_seeded_rng_is_reproducible_per_root():
+    assert draws(7, "a") == draws(7, "a")
+    assert draws(7, "a") != draws(7, "b")
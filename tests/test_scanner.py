@@ -0,0 +1,249 @@
+import time
+import argparse
+
+from VLTRE import scanner
+
+
+def scan_args(**overrides):
+    args = argparse.Namespace(ext=[".py", ".js"], top=3)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def write_files(root, files):
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def test_merge_results_adds_up_partials(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    write_files(first, {"a.py": "x\n" * 5, "lib/b.py": "x\n" * 50, "lib/c.js": "x\n" * 2})
+    write_files(second, {"d.py": "x\n" * 20, "e.txt": "notes\n", "pkg/f.js": "x\n" * 30,
+                         "pkg/g.py": "x\n" * 1})
+    parts = [scanner.scan_root(str(first), scan_args()), scanner.scan_root(str(second), scan_args())]
+
+    merged = scanner.merge_results(parts)
+    for key in ("dirs", "files", "counted_files", "total_lines", "total_bytes"):
+        assert merged[key] == parts[0][key] + parts[1][key]
+    assert merged["total_lines"] == 108
+    assert merged["by_ext"] == {".py": 76, ".js": 32}
+    assert merged["roots"] == parts[0]["roots"] + parts[1]["roots"]
+    assert len(merged["hosts"]) == 2
+    assert merged["options"] == parts[0]["options"]
+    assert [root["name"] for root in merged["tree"]] == merged["roots"]
+    # The overall largest files, limited to --top
+    assert [item[0] for item in merged["largest"]] == [50, 30, 20]
+    assert merged["elapsed"] == max(part["elapsed"] for part in parts)
+
+
+def test_merge_results_accepts_version_1_partials():
+    old = scanner.new_result()
+    old.pop("hosts")
+    old.update(roots=["/old"], files=2, total_lines=7, by_ext={".py": 7}, largest=[[7, "/old/a.py", False]])
+    new = scanner.new_result()
+    new.update(roots=["/new"], hosts=["h"], files=1, total_lines=3, by_ext={".py": 3})
+
+    merged = scanner.merge_results([old, new], top=5)
+    assert merged["hosts"] == [None, "h"]
+    assert merged["files"] == 3
+    assert merged["by_ext"] == {".py": 10}
+    assert merged["largest"] == [[7, "/old/a.py", False]]
+
+
+def test_option_conflicts_ignore_top():
+    parts = [scanner.new_result(), scanner.new_result()]
+    parts[0]["options"] = scanner.scan_options(scan_args(top=3))
+    parts[1]["options"] = scanner.scan_options(scan_args(top=10))
+    assert scanner.option_conflicts(parts) == []
+    parts[1]["options"] = scanner.scan_options(scan_args(where="ext == py"))
+    assert scanner.option_conflicts(parts) == ["where"]
+
+
+def test_worker_processes_give_the_same_result(tmp_path):
+    roots = []
+    for i in range(3):
+        root = tmp_path / f"root{i}"
+        write_files(root, {f"m{j}.py": "x\n" * (i + j + 1) for j in range(4)})
+        roots.append(str(root))
+    parallel = scanner.scan_roots(roots, scan_args(), jobs=3)
+    serial = scanner.scan_roots(roots, scan_args(), jobs=1)
+    for key in ("roots", "dirs", "files", "total_lines", "by_ext", "largest", "tree"):
+        assert parallel[key] == serial[key]
+
+
+def test_partial_round_trip(tmp_path):
+    write_files(tmp_path / "root", {"a.py": "x\n" * 3})
+    result = scanner.scan_root(str(tmp_path / "root"), scan_args())
+    path = str(tmp_path / "part.json")
+    scanner.save_partial(result, path)
+    assert scanner.load_partial(path) == result
+
+
+def test_dependency_names_match_exactly():
+    for name in ("node_modules", "venv", ".venv", "site-packages", "dist"):
+        assert scanner.is_dependency(name)
+    for name in ("environment", "mydist", "distutils", "venv2", "node_modules_backup"):
+        assert not scanner.is_dependency(name)
+
+
+def test_dependency_dirs_stay_out_of_rollups(tmp_path):
+    write_files(tmp_path, {"app/main.py": "x\n" * 4, "app/node_modules/pkg/index.js": "y" * 1000,
+                           "app/environment/e.py": "x\n"})
+    result = scanner.scan_root(str(tmp_path), scan_args(summarize_deps=True, share_entire_pot=True))
+    root = result["tree"][0]
+    app = next(child for child in root["children"] if child["name"] == "app")
+    deps = next(child for child in app["children"] if child.get("dependency"))
+    assert (deps["files"], deps["size"]) == (1, 1000)
+    assert (app["files"], app["size"]) == (result["files"], result["total_bytes"]) == (2, 10)
+    assert result["dependency_files"] == 1
+    assert result["dependency_bytes"] == 1000
+
+
+def rollup_tree():
+    return {"name": "/r", "type": "dir", "children": [
+        {"name": "small", "type": "dir", "children": [
+            {"name": "a.py", "type": "file", "lines": 3, "size": 30},
+        ]},
+        {"name": "big", "type": "dir", "children": [
+            {"name": "inner", "type": "dir", "children": [
+                {"name": "b.py", "type": "file", "lines": 40, "size": 100},
+                {"name": "c.bin", "type": "file", "size": 5000, "status": "binary"},
+            ]},
+            {"name": "d.py", "type": "file", "lines": 10, "size": 10},
+        ]},
+        {"name": "e.py", "type": "file", "lines": 1, "size": 1},
+    ]}
+
+
+def test_aggregate_rolls_up_every_directory():
+    root = rollup_tree()
+    scanner.aggregate(root)
+    small, big, _ = root["children"]
+    inner = big["children"][0]
+    assert (inner["lines"], inner["files"], inner["size"]) == (40, 2, 5100)
+    assert (big["lines"], big["files"], big["size"]) == (50, 3, 5110)
+    assert (small["lines"], small["files"], small["size"]) == (3, 1, 30)
+    assert (root["lines"], root["files"], root["size"]) == (54, 5, 5141)
+
+
+def test_sort_tree_by_lines_and_size():
+    root = rollup_tree()
+    scanner.aggregate(root)
+    scanner.sort_tree([root], "lines")
+    assert [child["name"] for child in root["children"]] == ["big", "small", "e.py"]
+    assert [child["name"] for child in root["children"][0]["children"]] == ["inner", "d.py"]
+    scanner.sort_tree([root], "size")
+    assert [child["name"] for child in root["children"]] == ["big", "small", "e.py"]
+    assert [child["name"] for child in root["children"][0]["children"][0]["children"]] == ["c.bin", "b.py"]
+    # name keeps the walk order
+    order = [child["name"] for child in root["children"]]
+    scanner.sort_tree([root], "name")
+    assert [child["name"] for child in root["children"]] == order
+
+
+def test_top_dirs():
+    root = rollup_tree()
+    scanner.aggregate(root)
+    by_lines = scanner.top_dirs([root], 2, "lines")
+    assert [(value, path) for value, path, _ in by_lines] == [(50, "/r/big"), (40, "/r/big/inner")]
+    assert by_lines[0][2] is root["children"][1]
+    by_size = scanner.top_dirs([root], 5, "size")
+    assert [path for _, path, _ in by_size] == ["/r/big", "/r/big/inner", "/r/small"]
+
+
+def test_time_budget_finishes_each_level_before_the_next(tmp_path, monkeypatch):
+    write_files(tmp_path, {f"d{i}/sub/deep{j}.py": "x\n" for i in range(3) for j in range(3)})
+    write_files(tmp_path, {f"d{i}/top{j}.py": "x\n" for i in range(3) for j in range(2)})
+    ticks = iter(range(10 ** 6))
+    monkeypatch.setattr(time, "monotonic", lambda: float(next(ticks)))
+    for budget in range(4, 30):
+        result = scanner.scan_root(str(tmp_path), scan_args(), deadline=time.monotonic() + budget)
+        root = result["tree"][0]
+        flagged = []
+        started = {1: False, 2: False}
+        unfinished = {1: False, 2: False}
+        for node in root["children"]:
+            subs = [c for c in node["children"] if c["type"] == "dir"]
+            started[1] |= bool(node["children"])
+            unfinished[1] |= bool(node.get("truncated"))
+            for sub in subs:
+                started[2] |= bool(sub["children"])
+                unfinished[2] |= bool(sub.get("truncated"))
+                flagged += [sub] if sub.get("truncated") else []
+            flagged += [node] if node.get("truncated") else []
+        # Breadth-first: nothing at depth 2 is read while depth 1 is unfinished
+        assert not (started[2] and unfinished[1])
+        assert result["pending_dirs"] == len(result["truncated"]) == len(flagged) + bool(root.get("truncated"))
+        if not result["pending_dirs"]:
+            assert result["files"] == 15
+            break
+    else:
+        raise AssertionError("budget never sufficed")
+
+
+def test_expired_budget_marks_the_root_truncated(tmp_path):
+    write_files(tmp_path, {"a.py": "x\n"})
+    result = scanner.scan_root(str(tmp_path), scan_args(), deadline=time.monotonic() - 1)
+    assert result["pending_dirs"] == 1
+    assert result["truncated"] == [str(tmp_path)]
+    assert result["tree"][0]["truncated"] is True
+    assert result["files"] == 0
+
+
+def test_size_only_never_opens_a_file(tmp_path, monkeypatch):
+    write_files(tmp_path, {"a.py": "x\n" * 10, "docs/b.md": "text", "data/c.bin": "\0" * 50})
+    (tmp_path / "pkg.zip").write_bytes(b"PK\x05\x06" + bytes(18))
+
+    def refuse(*args, **kwargs):
+        raise AssertionError(f"opened {args[0]!r}")
+
+    monkeypatch.setattr("builtins.open", refuse)
+    monkeypatch.setattr("io.open", refuse)
+    monkeypatch.setattr("os.open", refuse)
+    result = scanner.scan_root(str(tmp_path), scan_args(size_only=True, archives=True))
+    assert result["size_only"] is True
+    assert result["files"] == 4
+    assert result["total_bytes"] == 20 + 4 + 50 + 22
+    assert result["by_ext_bytes"] == {".py": 20, ".md": 4, ".bin": 50, ".zip": 22}
+    assert result["total_lines"] == 0 and result["bytes_read"] == 0 and result["archives"] == 0
+    # analyze_file() turns any failure into an "error" status, so a refused open shows up here
+    assert result["errors"] == 0 and result["unreadable_files"] == 0
+    assert [item[0] for item in result["largest_bytes"]] == [50, 22, 20]
+
+
+def test_project_totals_use_the_nearest_project(tmp_path):
+    write_files(tmp_path, {
+        "notes.py": "x\n" * 2,
+        "app/pyproject.toml": "[project]\n",
+        "app/main.py": "x\n" * 10,
+        "app/lib/util.py": "x\n" * 4,
+        "app/plugins/web/package.json": "{}",
+        "app/plugins/web/index.js": "x\n" * 30,
+        "app/plugins/web/node_modules/dep/dep.js": "x\n" * 500,
+        "tools/setup.py": "x\n" * 3,
+    })
+    result = scanner.scan_root(str(tmp_path), scan_args(projects=True, top=1))
+    projects = {p["path"]: p for p in result["projects"]}
+    app, web, tools = (str(tmp_path / rel) for rel in ("app", "app/plugins/web", "tools"))
+    assert [p["path"] for p in result["projects"]] == [web, app, tools, None]
+    # Files of a nested project are not counted again in the outer one
+    assert (projects[app]["files"], projects[app]["lines"]) == (3, 14)
+    assert projects[app]["by_ext"] == {".py": 14}
+    # Dependency directories are left out
+    assert (projects[web]["files"], projects[web]["lines"]) == (2, 30)
+    assert projects[tools]["lines"] == 3
+    assert (projects[None]["files"], projects[None]["lines"]) == (1, 2)
+    # --top limits the largest files listed per project
+    assert projects[app]["largest"] == [[10, str(tmp_path / "app" / "main.py")]]
+
+
+def test_project_at_the_root():
+    root = {"name": "/r", "type": "dir", "project": True, "children": [
+        {"name": "a.py", "type": "file", "lines": 5, "size": 50, "status": "counted"},
+        {"name": "b.bin", "type": "file", "size": 900, "status": "binary"},
+    ]}
+    assert scanner.project_totals(root) == [
+        {"path": "/r", "files": 2, "lines": 5, "size": 950, "by_ext": {".py": 5}, "largest": [[5, "/r/a.py"]]}]
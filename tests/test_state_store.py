@@ -0,0 +1,88 @@
+import io
+import os
+import json
+import contextlib
+import multiprocessing
+
+import pytest
+
+from VLTRE import cli, state_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    data_file = str(tmp_path / ".pot_progress.json")
+    monkeypatch.setattr(state_store, "DATA_FILE", data_file)
+    monkeypatch.setattr(state_store, "JOURNAL_DIR", str(tmp_path / ".pot_progress.d"))
+    monkeypatch.setattr(state_store, "_pending", {})
+    return data_file
+
+
+def use_store(data_file, journal_dir):
+    state_store.DATA_FILE = data_file
+    state_store.JOURNAL_DIR = journal_dir
+    state_store._pending.clear()
+
+
+def banner_run(data_file, journal_dir, barrier):
+    """One pot run: show the banner, then write progress once every run has read it."""
+    use_store(data_file, journal_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli.display_banner_with_tree()
+    barrier.wait()
+    state_store.flush()
+
+
+def increment_run(data_file, journal_dir, count):
+    use_store(data_file, journal_dir)
+    for _ in range(count):
+        state_store.add({"total_runs": 1})
+
+
+def run_processes(target, args, count):
+    processes = [multiprocessing.Process(target=target, args=args) for _ in range(count)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+
+def test_stage_is_derived_from_total_runs(store):
+    assert state_store.load() == {"total_runs": 0, "growth_stage": 0, "regrow_count": 0}
+    state_store.add({"total_runs": 57})
+    assert state_store.load() == {"total_runs": 57, "growth_stage": 0, "regrow_count": 5}
+    # Stage deltas are not stored
+    state_store.add({"growth_stage": 1, "regrow_count": 1})
+    state_store.save({"total_runs": 61, "growth_stage": 3})
+    assert state_store.load() == {"total_runs": 61, "growth_stage": 1, "regrow_count": 6}
+
+
+def test_legacy_progress_file(store):
+    with open(store, "w") as f:
+        json.dump({"growth_stage": 4, "regrow_count": 2, "total_runs": 23}, f)
+    assert state_store.load() == {"total_runs": 23, "growth_stage": 2, "regrow_count": 2}
+
+
+def test_deferred_increments_are_visible_before_they_are_written(store):
+    state_store.add({"total_runs": 1}, defer=True)
+    assert not os.path.exists(state_store.JOURNAL_DIR)
+    assert state_store.load()["total_runs"] == 1
+    state_store.flush()
+    state_store._pending.clear()
+    assert state_store.load()["total_runs"] == 1
+
+
+def test_concurrent_increments_are_not_lost(store):
+    run_processes(increment_run, (store, state_store.JOURNAL_DIR, 5), 20)
+    assert state_store.load()["total_runs"] == 100
+    state_store.compact()
+    assert state_store.load()["total_runs"] == 100
+    assert [name for name in os.listdir(state_store.JOURNAL_DIR) if name.endswith(".json")] == []
+
+
+def test_concurrent_runs_cross_a_stage_boundary_once(store):
+    state_store.add({"total_runs": 9})
+    count = 4
+    run_processes(banner_run, (store, state_store.JOURNAL_DIR, multiprocessing.Barrier(count)), count)
+    assert state_store.load() == {"total_runs": 13, "growth_stage": 1, "regrow_count": 1}
@@ -0,0 +1,103 @@
+import io
+import time
+import zipfile
+import argparse
+
+import pytest
+
+from VLTRE import analyzers, counting, scanner, throttle
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock; sleeping advances it instead of waiting."""
+    now = [1000.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(time, "sleep", sleep)
+    return now, slept
+
+
+class RecordingBucket:
+    def __init__(self):
+        self.taken = []
+
+    def acquire(self, *amounts):
+        self.taken.append(amounts)
+
+
+def test_bucket_starts_empty(clock):
+    _, slept = clock
+    bucket = throttle.TokenBucket((100, 0))
+    bucket.acquire(50, 0)
+    assert slept == [pytest.approx(0.5)]
+
+
+def test_bucket_sleeps_off_debt_and_refills(clock):
+    now, slept = clock
+    bucket = throttle.TokenBucket((100, 10))
+    bucket.acquire(0, 20)
+    assert slept == [pytest.approx(2.0)]
+    # Refilled for one second at most: a long pause does not allow a burst
+    now[0] += 60
+    bucket.acquire(100, 10)
+    assert len(slept) == 1
+    bucket.acquire(100, 0)
+    assert slept[-1] == pytest.approx(1.0)
+
+
+def test_zero_rate_is_not_limited(clock):
+    _, slept = clock
+    bucket = throttle.TokenBucket((0, 5))
+    bucket.acquire(10 ** 9, 0)
+    assert slept == []
+
+
+def test_new_bucket():
+    assert throttle.new_bucket() is None
+    assert throttle.new_bucket(0, 0, shared=True) is None
+    assert throttle.new_bucket(1024).rates == (1024, 0)
+    assert throttle.new_bucket(files_per_sec=3).rates == (0, 3)
+
+
+def test_shared_bucket_keeps_state_in_shared_memory(clock):
+    _, slept = clock
+    bucket = throttle.new_bucket(100, 0, shared=True)
+    bucket.acquire(30, 0)
+    assert slept == [pytest.approx(0.3)]
+    assert bucket.state[0] == pytest.approx(-30.0)
+
+
+def test_reads_are_charged_before_each_chunk(tmp_path):
+    path = tmp_path / "big.py"
+    path.write_bytes(b"value = 1\n" * 300_000)
+    size = path.stat().st_size
+    bucket = RecordingBucket()
+    pipeline = analyzers.build_analyzers(argparse.Namespace())
+    values, status = counting.analyze_file(str(path), pipeline, bucket=bucket)
+    assert (values, status) == ({"lines": 300_000}, "counted")
+    assert all(files == 0 and amount <= counting.READ_CHUNK_BYTES for amount, files in bucket.taken)
+    assert len(bucket.taken) > 2
+    assert sum(amount for amount, _ in bucket.taken) == size == counting.bytes_read(status, size)
+
+
+def test_nested_archives_are_charged_and_counted(tmp_path, monkeypatch):
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w") as zf:
+        zf.writestr("pkg/mod.py", "x = 1\n" * 10)
+    with zipfile.ZipFile(tmp_path / "outer.zip", "w") as zf:
+        zf.writestr("inner.zip", inner.getvalue())
+    bucket = RecordingBucket()
+    monkeypatch.setattr(throttle, "_installed", bucket)
+    args = argparse.Namespace(ext=[".py"], archives=True)
+    result = scanner.scan_root(str(tmp_path), args)
+    assert result["archives"] == 2
+    assert result["total_lines"] == 10
+    nested = len(inner.getvalue())
+    assert result["bytes_read"] == nested + 60
+    assert sum(amount for amount, _ in bucket.taken) == nested + 60